@@ -0,0 +1,102 @@
+import http from "node:http";
+
+export function percentile(sorted, p) {
+  if (sorted.length === 0) return null;
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1);
+  return sorted[Math.max(0, index)];
+}
+
+export function summarize(latenciesMs, elapsedMs) {
+  const sorted = Float64Array.from(latenciesMs).sort();
+  const total = sorted.reduce((sum, value) => sum + value, 0);
+  const round = (value) => (value == null ? null : Number(value.toFixed(3)));
+  return {
+    count: sorted.length,
+    throughputPerSec: round((sorted.length / elapsedMs) * 1000),
+    meanMs: round(sorted.length ? total / sorted.length : null),
+    minMs: round(sorted[0]),
+    p50Ms: round(percentile(sorted, 50)),
+    p95Ms: round(percentile(sorted, 95)),
+    p99Ms: round(percentile(sorted, 99)),
+    maxMs: round(sorted[sorted.length - 1]),
+  };
+}
+
+// 동시성 concurrency로 총 total번 task(i)를 실행하고 각 실행 시간을 측정
+export async function runConcurrent(task, { total, concurrency }) {
+  const latencies = [];
+  let next = 0;
+  const startedAt = performance.now();
+
+  async function worker() {
+    while (next < total) {
+      const index = next;
+      next += 1;
+      const begin = performance.now();
+      await task(index);
+      latencies.push(performance.now() - begin);
+    }
+  }
+
+  await Promise.all(Array.from({ length: Math.min(concurrency, total) }, worker));
+  return summarize(latencies, performance.now() - startedAt);
+}
+
+export async function withListeningServer(server, run) {
+  await new Promise((resolve) => server.listen(0, "127.0.0.1", resolve));
+  const agent = new http.Agent({ keepAlive: true, maxSockets: 256 });
+  try {
+    return await run({ port: server.address().port, agent });
+  } finally {
+    agent.destroy();
+    await new Promise((resolve) => server.close(resolve));
+  }
+}
+
+export function request(port, agent, { method = "GET", path, headers = {}, body } = {}) {
+  return new Promise((resolve, reject) => {
+    const payload = body ? JSON.stringify(body) : null;
+    const req = http.request(
+      {
+        host: "127.0.0.1",
+        port,
+        method,
+        path,
+        agent,
+        headers: payload
+          ? { ...headers, "Content-Type": "application/json", "Content-Length": Buffer.byteLength(payload) }
+          : headers,
+      },
+      (res) => {
+        let bytes = 0;
+        res.on("data", (chunk) => {
+          bytes += chunk.length;
+        });
+        res.on("end", () => resolve({ status: res.statusCode, headers: res.headers, bytes }));
+      },
+    );
+    req.on("error", reject);
+    req.end(payload ?? undefined);
+  });
+}
+
+// 마이크로벤치마크: 워밍업 후 durationMs 동안 fn을 반복 실행
+export function microbench(name, fn, { durationMs = 500, warmup = 1_000 } = {}) {
+  for (let i = 0; i < warmup; i += 1) fn(i);
+
+  let iterations = 0;
+  const startedAt = performance.now();
+  let elapsed = 0;
+  while (elapsed < durationMs) {
+    for (let i = 0; i < 1_000; i += 1) fn(iterations + i);
+    iterations += 1_000;
+    elapsed = performance.now() - startedAt;
+  }
+
+  return {
+    name,
+    iterations,
+    nsPerOp: Number(((elapsed * 1e6) / iterations).toFixed(1)),
+    opsPerSec: Math.round((iterations / elapsed) * 1000),
+  };
+}
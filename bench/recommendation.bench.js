@@ -0,0 +1,72 @@
+import {
+  collapseTimeline,
+  recommendHourly,
+  recommendOutfit,
+  selectTemperatureBand,
+} from "../src/recommendation.js";
+import { createRandom } from "./upstream-simulator.js";
+import { microbench } from "./harness.js";
+
+// src/recommendation.js 마이크로벤치마크
+export function runRecommendationMicrobench({ durationMs = 500 } = {}) {
+  const random = createRandom(42);
+  const snapshots = Array.from({ length: 1_024 }, () => ({
+    tempC: -10 + random() * 45,
+    humidity: random() * 100,
+    uvIndex: random() * 11,
+    precipitationMm: random() < 0.3 ? random() * 3 : 0,
+    precipitationProbability: random() * 100,
+    temperatureRange: random() * 15,
+    pm25: random() * 60,
+    pm10: random() * 120,
+    airQualityIndex: random() * 150,
+  }));
+
+  const hours = 48;
+  const column = (pick) => Float64Array.from({ length: hours }, (_, hour) => pick(snapshots[hour]));
+  const columns = {
+    tempC: column((s) => s.tempC),
+    humidity: column((s) => s.humidity),
+    uvIndex: column((s) => s.uvIndex),
+    precipitationMm: column((s) => s.precipitationMm),
+    precipitationProbability: column((s) => s.precipitationProbability),
+    pm25: column((s) => s.pm25),
+  };
+  const time = Array.from({ length: hours }, (_, hour) => `2026-02-13T${String(hour % 24).padStart(2, "0")}:00`);
+
+  let sink = 0;
+  const results = [
+    microbench(
+      "recommendation/selectTemperatureBand",
+      (i) => {
+        sink += selectTemperatureBand(snapshots[i & 1023].tempC).min;
+      },
+      { durationMs },
+    ),
+    microbench(
+      "recommendation/recommendOutfit",
+      (i) => {
+        sink += recommendOutfit(snapshots[i & 1023]).accessories.length;
+      },
+      { durationMs },
+    ),
+    microbench(
+      "recommendation/recommendHourly/48h",
+      () => {
+        sink += recommendHourly(columns).bands[0];
+      },
+      { durationMs },
+    ),
+    microbench(
+      "recommendation/recommendHourly+collapseTimeline/48h",
+      () => {
+        sink += collapseTimeline(time, recommendHourly(columns)).segments.length;
+      },
+      { durationMs },
+    ),
+  ];
+
+  // 최적화로 계산이 제거되지 않도록 결과 사용
+  if (sink === Number.NEGATIVE_INFINITY) console.log(sink);
+  return results;
+}
@@ -0,0 +1,73 @@
+import { createWeatherServer } from "../src/server/app-server.js";
+import { createUpstreamCache } from "../src/server/upstream-cache.js";
+import { createRandom } from "./upstream-simulator.js";
+import { request, runConcurrent, withListeningServer } from "./harness.js";
+
+// POST /api/recommendations 처리량/지연 측정
+// - cold: 요청마다 새 좌표를 사용해 캐시를 우회하고 외부 API 파이프라인 전체를 측정
+// - warm: 같은 좌표를 반복해 캐시 적중 경로를 측정
+function buildLocations(count, random, distinct) {
+  return Array.from({ length: count }, (_, index) => ({
+    id: `bench-${index}`,
+    name: `City ${index}`,
+    latitude: distinct ? Number((-60 + random() * 120).toFixed(4)) : 10 + index,
+    longitude: distinct ? Number((-180 + random() * 360).toFixed(4)) : 100 + index,
+  }));
+}
+
+export async function runRecommendationsBench({
+  simulator,
+  locationCounts = [1, 5, 20],
+  concurrencyLevels = [1, 8, 32],
+  requestsPerScenario = 100,
+  modes = ["cold", "warm"],
+  stream = false,
+} = {}) {
+  const results = [];
+
+  for (const mode of modes) {
+    for (const locationCount of locationCounts) {
+      for (const concurrency of concurrencyLevels) {
+        simulator.reset();
+        const random = createRandom(locationCount * 1_000 + concurrency);
+        // 로컬 스냅샷 파일이나 KV 환경 변수에 따라 결과가 달라지지 않도록 스냅샷은 끈다
+        const server = createWeatherServer({
+          fetchImpl: simulator.fetch,
+          cache: createUpstreamCache(),
+          snapshot: null,
+          snapshotStore: null,
+        });
+        const warmLocations = buildLocations(locationCount, random, false);
+
+        const summary = await withListeningServer(server, async ({ port, agent }) => {
+          const send = (locations) =>
+            request(port, agent, {
+              method: "POST",
+              path: stream ? "/api/recommendations?stream=ndjson" : "/api/recommendations",
+              body: { locations },
+            });
+
+          if (mode === "warm") {
+            await send(warmLocations);
+          }
+
+          return runConcurrent(
+            () => send(mode === "warm" ? warmLocations : buildLocations(locationCount, random, true)),
+            { total: requestsPerScenario, concurrency },
+          );
+        });
+
+        results.push({
+          name: `recommendations/${mode}/locations=${locationCount}/concurrency=${concurrency}${stream ? "/ndjson" : ""}`,
+          mode,
+          locationCount,
+          concurrency,
+          ...summary,
+          upstream: simulator.stats(),
+        });
+      }
+    }
+  }
+
+  return results;
+}
@@ -0,0 +1,120 @@
+// 오프라인 벤치마크 실행기
+//   node bench/run.js                       전체 실행, bench/results/<commit>.json 저장
+//   node bench/run.js --quick               시나리오/반복 수를 줄여 빠르게 실행
+//   node bench/run.js --only=micro,static   일부 스위트만 실행 (recommendations, static, micro)
+//   node bench/run.js --out=result.json --compare=bench/results/base.json
+import { execFileSync } from "node:child_process";
+import { mkdir, readFile, writeFile } from "node:fs/promises";
+import os from "node:os";
+import path from "node:path";
+import { fileURLToPath } from "node:url";
+import { runRecommendationMicrobench } from "./recommendation.bench.js";
+import { runRecommendationsBench } from "./recommendations.bench.js";
+import { runStaticBench } from "./static.bench.js";
+import { createUpstreamSimulator } from "./upstream-simulator.js";
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const RESULT_VERSION = 1;
+
+function parseArgs(argv) {
+  const args = {};
+  for (const arg of argv) {
+    const [key, value = "true"] = arg.replace(/^--/, "").split("=");
+    args[key] = value;
+  }
+  return args;
+}
+
+function currentCommit() {
+  try {
+    return execFileSync("git", ["rev-parse", "--short", "HEAD"], { cwd: __dirname, encoding: "utf8" }).trim();
+  } catch {
+    return null;
+  }
+}
+
+// 같은 이름의 결과끼리 p99/처리량/ns-per-op 변화율 출력
+function compareResults(baseline, current) {
+  const baseByName = new Map(
+    Object.values(baseline.suites ?? {})
+      .flat()
+      .map((result) => [result.name, result]),
+  );
+  const rows = [];
+
+  for (const result of Object.values(current.suites).flat()) {
+    const base = baseByName.get(result.name);
+    if (!base) continue;
+    for (const metric of ["p99Ms", "throughputPerSec", "nsPerOp"]) {
+      if (typeof result[metric] === "number" && typeof base[metric] === "number" && base[metric] !== 0) {
+        const change = ((result[metric] - base[metric]) / base[metric]) * 100;
+        rows.push({ name: result.name, metric, base: base[metric], current: result[metric], changePct: Number(change.toFixed(1)) });
+      }
+    }
+  }
+  return rows;
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const quick = args.quick === "true";
+  const only = new Set((args.only ?? "recommendations,static,micro").split(","));
+  const simulator = createUpstreamSimulator({ seed: Number(args.seed ?? 1) });
+  const suites = {};
+
+  if (only.has("recommendations")) {
+    suites.recommendations = await runRecommendationsBench({
+      simulator,
+      locationCounts: quick ? [1, 10] : [1, 5, 20, 50],
+      concurrencyLevels: quick ? [1, 16] : [1, 8, 32],
+      requestsPerScenario: quick ? 30 : 200,
+    });
+  }
+
+  if (only.has("static")) {
+    suites.static = await runStaticBench({ simulator, requestsPerScenario: quick ? 100 : 1_000 });
+  }
+
+  if (only.has("micro")) {
+    suites.micro = runRecommendationMicrobench({ durationMs: quick ? 100 : 500 });
+  }
+
+  const commit = currentCommit();
+  const output = {
+    version: RESULT_VERSION,
+    meta: {
+      commit,
+      date: new Date().toISOString(),
+      node: process.version,
+      platform: `${os.platform()}-${os.arch()}`,
+      cpus: os.cpus().length,
+      quick,
+    },
+    suites,
+  };
+
+  const outFile = args.out
+    ? path.resolve(args.out)
+    : path.join(__dirname, "results", `${commit ?? "local"}${quick ? "-quick" : ""}.json`);
+  await mkdir(path.dirname(outFile), { recursive: true });
+  await writeFile(outFile, `${JSON.stringify(output, null, 2)}\n`);
+
+  for (const result of Object.values(suites).flat()) {
+    const headline =
+      result.nsPerOp != null
+        ? `${result.nsPerOp} ns/op`
+        : `p50 ${result.p50Ms} ms, p99 ${result.p99Ms} ms, ${result.throughputPerSec} req/s`;
+    console.log(`${result.name}: ${headline}`);
+  }
+  console.log(`\n결과 저장: ${outFile}`);
+
+  if (args.compare) {
+    const baseline = JSON.parse(await readFile(path.resolve(args.compare), "utf8"));
+    console.table(compareResults(baseline, output));
+  }
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exitCode = 1;
+});
@@ -0,0 +1,49 @@
+import { createWeatherServer } from "../src/server/app-server.js";
+import { request, runConcurrent, withListeningServer } from "./harness.js";
+
+const SCENARIOS = [
+  { name: "static/png", path: "/assets/clothes/hot.png" },
+  { name: "static/app.js/gzip", path: "/app.js", headers: { "Accept-Encoding": "gzip" } },
+  { name: "static/app.js/br", path: "/app.js", headers: { "Accept-Encoding": "br" } },
+  { name: "static/index.html/identity", path: "/" },
+  { name: "static/png/range", path: "/assets/clothes/hot.png", headers: { Range: "bytes=0-65535" } },
+];
+
+export async function runStaticBench({ simulator, requestsPerScenario = 500, concurrency = 16 } = {}) {
+  const server = createWeatherServer({ fetchImpl: simulator.fetch, snapshot: null, snapshotStore: null });
+  const results = [];
+
+  await withListeningServer(server, async ({ port, agent }) => {
+    // 시작 시 압축본/해시 준비(warm)가 끝난 뒤 측정
+    await new Promise((resolve) => setTimeout(resolve, 200));
+    const etags = {};
+    for (const scenario of SCENARIOS) {
+      const response = await request(port, agent, { path: scenario.path, headers: scenario.headers });
+      etags[scenario.name] = response.headers.etag;
+    }
+
+    for (const scenario of SCENARIOS) {
+      let bytes = 0;
+      const summary = await runConcurrent(
+        async () => {
+          const response = await request(port, agent, { path: scenario.path, headers: scenario.headers });
+          bytes += response.bytes;
+        },
+        { total: requestsPerScenario, concurrency },
+      );
+      results.push({ name: scenario.name, ...summary, bytesPerRequest: Math.round(bytes / requestsPerScenario) });
+    }
+
+    const conditional = await runConcurrent(
+      () =>
+        request(port, agent, {
+          path: "/assets/clothes/hot.png",
+          headers: { "If-None-Match": etags["static/png"] },
+        }),
+      { total: requestsPerScenario, concurrency },
+    );
+    results.push({ name: "static/png/304", ...conditional, bytesPerRequest: 0 });
+  });
+
+  return results;
+}
@@ -0,0 +1,195 @@
+// 오프라인 벤치마크용 외부 API 시뮬레이터
+// createWeatherServer({ fetchImpl })에 주입하는 fetch 구현으로, 호스트별 지연 분포/오류율/응답 크기를 조절
+// tests/server.test.js의 buildMockFetch와 같은 방식(hostname 분기 + json() 응답)을 확장
+
+const DEFAULT_HOSTS = {
+  "api.open-meteo.com": { latency: { type: "lognormal", medianMs: 40, sigma: 0.5 }, errorRate: 0 },
+  "air-quality-api.open-meteo.com": { latency: { type: "lognormal", medianMs: 60, sigma: 0.6 }, errorRate: 0 },
+  "api.waqi.info": { latency: { type: "lognormal", medianMs: 120, sigma: 0.8 }, errorRate: 0.5 },
+  "geocoding-api.open-meteo.com": { latency: { type: "fixed", ms: 30 }, errorRate: 0 },
+};
+
+// 재현 가능한 결과를 위한 시드 기반 난수 (mulberry32)
+export function createRandom(seed = 1) {
+  let state = seed >>> 0;
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+  };
+}
+
+export function sampleLatency(latency, random) {
+  if (!latency) return 0;
+  switch (latency.type) {
+    case "fixed":
+      return latency.ms;
+    case "uniform":
+      return latency.minMs + random() * (latency.maxMs - latency.minMs);
+    case "lognormal": {
+      // Box-Muller로 정규분포를 만든 뒤 median * e^(sigma * z)
+      const z = Math.sqrt(-2 * Math.log(1 - random())) * Math.cos(2 * Math.PI * random());
+      return latency.medianMs * Math.exp(latency.sigma * z);
+    }
+    default:
+      throw new Error(`알 수 없는 지연 분포: ${latency.type}`);
+  }
+}
+
+function jsonResponse(payload, status = 200) {
+  return {
+    ok: status >= 200 && status < 300,
+    status,
+    async json() {
+      return payload;
+    },
+  };
+}
+
+function sleep(ms, signal) {
+  return new Promise((resolve, reject) => {
+    if (signal?.aborted) {
+      reject(signal.reason ?? new Error("aborted"));
+      return;
+    }
+    const timer = setTimeout(resolve, ms);
+    signal?.addEventListener(
+      "abort",
+      () => {
+        clearTimeout(timer);
+        reject(signal.reason ?? new Error("aborted"));
+      },
+      { once: true },
+    );
+  });
+}
+
+function hourlyTimes(hours) {
+  const start = Date.UTC(2026, 1, 13);
+  return Array.from({ length: hours }, (_, hour) => new Date(start + hour * 3_600_000).toISOString().slice(0, 16));
+}
+
+function series(hours, base, amplitude, random) {
+  return Array.from({ length: hours }, (_, hour) =>
+    Number((base + amplitude * Math.sin((hour / 24) * 2 * Math.PI) + random()).toFixed(1)),
+  );
+}
+
+function forecastPayload(latitude, hours, random) {
+  const base = 25 - Math.abs(latitude) / 3;
+  return {
+    timezone: "Asia/Seoul",
+    current: {
+      time: "2026-02-13T09:00",
+      temperature_2m: Number((base + random() * 4).toFixed(1)),
+      relative_humidity_2m: Math.round(40 + random() * 50),
+      uv_index: Number((random() * 9).toFixed(1)),
+      precipitation: random() < 0.2 ? 0.5 : 0,
+    },
+    daily: {
+      precipitation_probability_max: [Math.round(random() * 100), Math.round(random() * 100)],
+      temperature_2m_max: [base + 5, base + 4],
+      temperature_2m_min: [base - 4, base - 5],
+      uv_index_max: [6, 5],
+      precipitation_sum: [0, 1.2],
+    },
+    hourly: {
+      time: hourlyTimes(hours),
+      temperature_2m: series(hours, base, 5, random),
+      relative_humidity_2m: series(hours, 60, 15, random),
+      uv_index: series(hours, 3, 3, random),
+      precipitation: series(hours, 0, 0.3, random),
+      precipitation_probability: series(hours, 30, 30, random),
+    },
+  };
+}
+
+function airQualityPayload(target, hours, random) {
+  if (target.searchParams.has("current")) {
+    return {
+      current: {
+        pm2_5: Number((random() * 60).toFixed(1)),
+        pm10: Number((random() * 100).toFixed(1)),
+        us_aqi: Math.round(random() * 150),
+      },
+    };
+  }
+  return {
+    hourly: {
+      time: hourlyTimes(hours),
+      pm2_5: series(hours, 20, 10, random),
+      pm10: series(hours, 40, 20, random),
+      us_aqi: series(hours, 60, 20, random),
+    },
+  };
+}
+
+export function createUpstreamSimulator({ hosts = {}, seed = 1, hourlyHours = 48 } = {}) {
+  const random = createRandom(seed);
+  const config = Object.fromEntries(
+    Object.entries({ ...DEFAULT_HOSTS, ...hosts }).map(([host, value]) => [
+      host,
+      { ...DEFAULT_HOSTS[host], ...value },
+    ]),
+  );
+  const counters = {};
+
+  function count(host, key) {
+    counters[host] ??= { calls: 0, errors: 0, coordinates: 0 };
+    counters[host][key] += 1;
+  }
+
+  async function simulatedFetch(url, options = {}) {
+    const target = typeof url === "string" ? new URL(url) : url;
+    const host = target.hostname;
+    const hostConfig = config[host] ?? { latency: { type: "fixed", ms: 0 }, errorRate: 0 };
+    count(host, "calls");
+
+    await sleep(sampleLatency(hostConfig.latency, random), options.signal);
+
+    if (random() < (hostConfig.errorRate ?? 0)) {
+      count(host, "errors");
+      return jsonResponse({ message: "simulated upstream error" }, 503);
+    }
+
+    const hours = hostConfig.hourlyHours ?? hourlyHours;
+    const latitudes = (target.searchParams.get("latitude") || "0").split(",").map(Number);
+    counters[host].coordinates += latitudes.length;
+
+    if (host === "api.open-meteo.com") {
+      const results = latitudes.map((latitude) => forecastPayload(latitude, hours, random));
+      return jsonResponse(results.length === 1 ? results[0] : results);
+    }
+
+    if (host === "air-quality-api.open-meteo.com") {
+      const results = latitudes.map(() => airQualityPayload(target, hours, random));
+      return jsonResponse(results.length === 1 ? results[0] : results);
+    }
+
+    if (host === "api.waqi.info") {
+      return jsonResponse({
+        status: "ok",
+        data: { aqi: Math.round(random() * 150), iaqi: { pm25: { v: 20 }, pm10: { v: 40 } } },
+      });
+    }
+
+    if (host === "geocoding-api.open-meteo.com") {
+      const name = target.searchParams.get("name") || "Unknown";
+      return jsonResponse({ results: [{ name, latitude: 37.5, longitude: 127.0, country: "South Korea" }] });
+    }
+
+    return jsonResponse({ message: "Not found" }, 404);
+  }
+
+  function stats() {
+    return structuredClone(counters);
+  }
+
+  function reset() {
+    for (const key of Object.keys(counters)) delete counters[key];
+  }
+
+  return { fetch: simulatedFetch, stats, reset };
+}
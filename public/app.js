@@ -1,3 +1,6 @@
+// 예보/대기질은 서버에서 위치를 묶어 배치로 조회하므로 대시보드 규모까지 허용
+const MAX_LOCATIONS = 30;
+
 const state = {
   locations: [],
   cards: [],
@@ -22,6 +25,9 @@ tabTodayEl.addEventListener("click", () => setDateFilter("today"));
 tabTomorrowEl.addEventListener("click", () => setDateFilter("tomorrow"));
 
 let searchTimeout = null;
+let suggestionSeq = 0;
+let recommendationSeq = 0;
+let recommendationController = null;
 
 inputEl.addEventListener("input", (e) => {
   const val = e.target.value.trim();
@@ -36,14 +42,16 @@ inputEl.addEventListener("input", (e) => {
   clearTimeout(searchTimeout);
 
   if (!val) {
+    // 진행 중인 검색 응답이 도착해도 드롭다운을 다시 열지 않도록 무효화
+    suggestionSeq += 1;
     autocompleteListEl.hidden = true;
     return;
   }
 
-  // 1초 디바운스
+  // 주요 도시는 서버 색인에서 바로 응답하므로 짧게 디바운스
   searchTimeout = setTimeout(() => {
     fetchSuggestions(val);
-  }, 1000);
+  }, 150);
 });
 
 // 외부 클릭 시 드롭다운 닫기
@@ -95,17 +103,24 @@ function saveToLocal() {
   localStorage.setItem("weather_locations", JSON.stringify(state.locations));
 }
 
+function buildGeocodeUrl(query, count) {
+  const endpoint = new URL("/api/geocode", window.location.origin);
+  endpoint.searchParams.set("name", query);
+  endpoint.searchParams.set("count", String(count));
+  endpoint.searchParams.set("language", "en");
+  return endpoint;
+}
+
 async function fetchSuggestions(query) {
+  const seq = ++suggestionSeq;
   try {
-    const endpoint = new URL("https://geocoding-api.open-meteo.com/v1/search");
-    endpoint.searchParams.set("name", query);
-    endpoint.searchParams.set("count", "5");
-    endpoint.searchParams.set("language", "en");
-
-    const response = await fetch(endpoint);
+    const response = await fetch(buildGeocodeUrl(query, 5));
     const data = await response.json();
     const results = data?.results || [];
 
+    // 더 최근 입력의 응답이 이미 도착했으면 늦게 온 이전 응답은 버림
+    if (seq !== suggestionSeq) return;
+
     renderAutocomplete(results);
   } catch (error) {
     console.error("자동완성 조회 실패", error);
@@ -136,8 +151,8 @@ async function addLocationFromSuggestion(item) {
   inputEl.value = "";
   applyButtonEl.disabled = true;
 
-  if (state.locations.length >= 2) {
-    updateStatus("위치는 최대 2개까지만 저장할 수 있습니다.", "error");
+  if (state.locations.length >= MAX_LOCATIONS) {
+    updateStatus(`위치는 최대 ${MAX_LOCATIONS}개까지만 저장할 수 있습니다.`, "error");
     return;
   }
 
@@ -160,19 +175,14 @@ async function onAddLocation(event) {
   const query = inputEl.value.trim();
   if (!query) return;
 
-  if (state.locations.length >= 2) {
-    updateStatus("위치는 최대 2개까지만 저장할 수 있습니다.", "error");
+  if (state.locations.length >= MAX_LOCATIONS) {
+    updateStatus(`위치는 최대 ${MAX_LOCATIONS}개까지만 저장할 수 있습니다.`, "error");
     return;
   }
 
   try {
     updateStatus("위치 검색 중...", "loading");
-    const endpoint = new URL("https://geocoding-api.open-meteo.com/v1/search");
-    endpoint.searchParams.set("name", query);
-    endpoint.searchParams.set("count", "1");
-    endpoint.searchParams.set("language", "en");
-
-    const response = await fetch(endpoint);
+    const response = await fetch(buildGeocodeUrl(query, 1));
     const data = await response.json();
     const first = data?.results?.[0];
 
@@ -224,7 +234,7 @@ function renderLocationTags() {
     button.addEventListener("click", () => removeLocation(button.dataset.id));
   }
 
-  if (state.locations.length >= 2) {
+  if (state.locations.length >= MAX_LOCATIONS) {
     inputEl.placeholder = "";
   } else {
     inputEl.placeholder = "위치 추가: 예) Seoul, Tokyo";
@@ -232,10 +242,17 @@ function renderLocationTags() {
 }
 
 async function refreshRecommendations() {
+  // 이전 갱신이 아직 스트리밍 중이면 취소하고, 늦게 도착한 이전 응답은 버림
+  const seq = ++recommendationSeq;
+  recommendationController?.abort();
+  const controller = new AbortController();
+  recommendationController = controller;
+  const locations = state.locations.slice();
+
   try {
     updateStatus("날씨 및 추천 갱신 중...", "loading");
 
-    if (state.locations.length === 0) {
+    if (locations.length === 0) {
       state.cards = [];
       renderCards();
       updateStatus("위치를 추가해주세요.", "ok");
@@ -244,35 +261,99 @@ async function refreshRecommendations() {
 
     const response = await fetch("/api/recommendations", {
       method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ locations: state.locations }),
+      headers: { "Content-Type": "application/json", Accept: "application/x-ndjson" },
+      body: JSON.stringify({ locations }),
+      signal: controller.signal,
     });
-    const data = await response.json();
 
-    if (!response.ok) {
-      throw new Error(data.message || "추천 조회에 실패했습니다.");
+    const contentType = response.headers.get("Content-Type") || "";
+    if (!response.ok || !contentType.includes("application/x-ndjson") || !response.body) {
+      const data = await response.json();
+      if (!response.ok) {
+        throw new Error(data.message || "추천 조회에 실패했습니다.");
+      }
+      if (seq !== recommendationSeq) return;
+      state.cards = data.cards;
+      renderCards();
+      updateStatus("추천이 최신 상태입니다.", "ok");
+      return;
     }
 
-    state.cards = data.cards;
-    renderCards();
-    updateStatus("추천이 최신 상태입니다.", "ok");
+    // 준비된 카드부터 한 장씩 도착하므로 받는 즉시 위치 순서 자리에 렌더링
+    if (seq !== recommendationSeq) return;
+    const cards = [];
+    let failed = 0;
+    state.cards = cards;
+    await readCardStream(response.body, (event) => {
+      if (seq !== recommendationSeq) return;
+      if (event.type === "card") {
+        cards[event.index] = event.card;
+        renderCards();
+      } else if (event.type === "error") {
+        failed += 1;
+        cards[event.index] = { name: locations[event.index]?.name ?? "알 수 없는 위치", error: event.message };
+        renderCards();
+      }
+    });
+
+    if (seq !== recommendationSeq) return;
+    if (failed > 0) {
+      updateStatus(`${failed}개 위치의 추천을 불러오지 못했습니다.`, "error");
+    } else {
+      updateStatus("추천이 최신 상태입니다.", "ok");
+    }
   } catch (error) {
+    if (seq !== recommendationSeq) return;
     updateStatus(error.message || "추천 조회 실패", "error");
+  } finally {
+    if (recommendationController === controller) {
+      recommendationController = null;
+    }
+  }
+}
+
+async function readCardStream(body, onEvent) {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffered = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    buffered += decoder.decode(value, { stream: !done });
+
+    const lines = buffered.split("\n");
+    buffered = done ? "" : lines.pop();
+    for (const line of lines) {
+      if (line.trim()) onEvent(JSON.parse(line));
+    }
+
+    if (done) return;
   }
 }
 
 function renderCards() {
   const cardsEl = document.getElementById("cards");
+  // 스트리밍 중에는 아직 도착하지 않은 위치가 빈 칸으로 남아 있음
+  const cards = state.cards.filter(Boolean);
 
-  if (state.cards.length === 0) {
+  if (cards.length === 0) {
     cardsEl.innerHTML = "<p class=\"empty\">위치를 추가하면 추천이 표시됩니다.</p>";
     return;
   }
 
-  cardsEl.classList.toggle("single-card", state.cards.length === 1);
+  cardsEl.classList.toggle("single-card", cards.length === 1);
 
-  cardsEl.innerHTML = state.cards
+  cardsEl.innerHTML = cards
     .map((entry) => {
+      if (entry.error) {
+        return `
+      <article class="card card-error">
+        <h2>${entry.name}</h2>
+        <p class="metrics-sub">추천을 불러오지 못했습니다: ${entry.error}</p>
+      </article>
+        `;
+      }
+
       const isTomorrow = state.dateFilter === "tomorrow";
       const weather = isTomorrow && entry.weather.tomorrow ? entry.weather.tomorrow : entry.weather;
       const recommendation = isTomorrow && entry.tomorrowRecommendation ? entry.tomorrowRecommendation : entry.recommendation;
@@ -336,6 +417,7 @@ function renderCards() {
           </div>
         </div>
         <p class="metrics-sub">강수확률: ${weather.precipitationProbability != null ? weather.precipitationProbability : "미확인"}%, 일교차: ${rangeLabel || "미확인"}</p>
+        ${!isTomorrow && entry.timeline?.summary ? `<p class="metrics-sub">시간대별: ${entry.timeline.summary}</p>` : ""}
         <p class="metrics-sub">데이터: ${weather.source === "fallback" ? `임시 (${weather.sourceMessage || "연결 실패"})` : "실시간 기준"} (${formatWeatherTimestamp(weather.updatedAt, weather.timezone)})</p>
         <hr class="divider"/>
         <h3 class="section-title">${isTomorrow ? "Tomorrow's" : "Today's"} Outfit</h3>
@@ -0,0 +1,72 @@
+// 인기 위치 스냅샷 생성기 (배포 전이나 주기 작업에서 실행)
+//   node scripts/refresh-snapshot.js                              인구 상위 50개 도시 -> data/snapshot.bin
+//   node scripts/refresh-snapshot.js --top=96 --max-age-min=60
+//   node scripts/refresh-snapshot.js --top=0 --grid=33,38.5,125,130,0.5 --out=/tmp/snapshot.bin
+//   node scripts/refresh-snapshot.js --upload                   공유 저장소(KV_REST_API_URL/TOKEN)에도 기록
+import { mkdir, writeFile } from "node:fs/promises";
+import path from "node:path";
+import { fileURLToPath } from "node:url";
+import { buildRecommendationSnapshot } from "../src/server/app-server.js";
+import { loadGazetteer } from "../src/server/geocoder.js";
+import { DEFAULT_SNAPSHOT_FILE, openSnapshot, selectSnapshotLocations } from "../src/server/snapshot.js";
+import { createSnapshotStoreFromEnv } from "../src/server/snapshot-store.js";
+
+function parseArgs(argv) {
+  const args = {};
+  for (const arg of argv) {
+    const [key, value = "true"] = arg.replace(/^--/, "").split("=");
+    args[key] = value;
+  }
+  return args;
+}
+
+function parseGrid(value) {
+  if (!value) return null;
+  const parts = value.split(",").map(Number);
+  const [latMin, latMax, lonMin, lonMax, step] = parts;
+  if (parts.length !== 5 || parts.some(Number.isNaN) || step <= 0) {
+    throw new Error("--grid는 latMin,latMax,lonMin,lonMax,step 형식이어야 합니다.");
+  }
+  return { latMin, latMax, lonMin, lonMax, step };
+}
+
+async function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const locations = selectSnapshotLocations({
+    gazetteer: loadGazetteer(),
+    top: Number(args.top ?? 50),
+    grid: parseGrid(args.grid),
+  });
+
+  const startedAt = Date.now();
+  const { buffer, count } = await buildRecommendationSnapshot({
+    locations,
+    maxAgeMs: Number(args["max-age-min"] ?? 45) * 60_000,
+  });
+
+  // 모두 실패했으면 기존 스냅샷을 빈 파일로 덮어쓰지 않는다
+  if (count === 0) {
+    throw new Error("스냅샷에 넣을 위치를 하나도 조회하지 못했습니다.");
+  }
+
+  const outFile = args.out ? path.resolve(args.out) : fileURLToPath(DEFAULT_SNAPSHOT_FILE);
+  await mkdir(path.dirname(outFile), { recursive: true });
+  await writeFile(outFile, buffer);
+
+  if (args.upload === "true") {
+    const store = createSnapshotStoreFromEnv();
+    if (!store) {
+      throw new Error("--upload에는 KV_REST_API_URL과 KV_REST_API_TOKEN 환경 변수가 필요합니다.");
+    }
+    await store.save(buffer, { ttlMs: openSnapshot(buffer).maxAgeMs });
+  }
+
+  console.log(
+    `${count}/${locations.length}개 위치, ${buffer.length} bytes, ${Date.now() - startedAt} ms -> ${outFile}`,
+  );
+}
+
+main().catch((error) => {
+  console.error(error);
+  process.exitCode = 1;
+});
@@ -57,8 +57,32 @@ export const OUTFIT_BANDS = [
   },
 ];
 
+// 밴드 경계(min)가 모두 정수이므로 floor(기온) 하나로 밴드를 바로 찾는 조회 테이블
+const BAND_TABLE_MIN = -40;
+const BAND_TABLE_MAX = 50;
+const BAND_TABLE = (() => {
+  const table = new Uint8Array(BAND_TABLE_MAX - BAND_TABLE_MIN + 1);
+  for (let temp = BAND_TABLE_MIN; temp <= BAND_TABLE_MAX; temp += 1) {
+    const index = OUTFIT_BANDS.findIndex((band) => temp >= band.min);
+    table[temp - BAND_TABLE_MIN] = index === -1 ? OUTFIT_BANDS.length - 1 : index;
+  }
+  return table;
+})();
+
+export const NO_BAND = 255;
+
+export function selectBandIndex(tempC) {
+  if (typeof tempC !== "number" || Number.isNaN(tempC)) {
+    return OUTFIT_BANDS.length - 1;
+  }
+  const floored = Math.floor(tempC);
+  if (floored <= BAND_TABLE_MIN) return BAND_TABLE[0];
+  if (floored >= BAND_TABLE_MAX) return BAND_TABLE[BAND_TABLE.length - 1];
+  return BAND_TABLE[floored - BAND_TABLE_MIN];
+}
+
 export function selectTemperatureBand(tempC) {
-  return OUTFIT_BANDS.find((band) => tempC >= band.min) || OUTFIT_BANDS[OUTFIT_BANDS.length - 1];
+  return OUTFIT_BANDS[selectBandIndex(tempC)];
 }
 
 export function recommendOutfit({
@@ -131,3 +155,112 @@ export function recommendOutfit({
     accessories: accessoriesWithNotes,
   };
 }
+
+// 시간대별 타임라인에서 소품 조합을 비트마스크로 표현 (배열 순서가 비트 순서)
+export const ACCESSORY_BITS = ["선크림", "모자", "양산", "선글라스", "우산", "목도리", "장갑", "마스크", "머플러"];
+
+const SUNSCREEN = 1 << 0;
+const SUN_GEAR = (1 << 1) | (1 << 2) | (1 << 3);
+const UMBRELLA = 1 << 4;
+const WARM_GEAR = (1 << 5) | (1 << 6);
+const MASK = 1 << 7;
+const MUFFLER = 1 << 8;
+
+export function accessoriesFromMask(mask) {
+  return ACCESSORY_BITS.filter((_, bit) => mask & (1 << bit));
+}
+
+// 열(column) 단위 시간별 배열(typed array 또는 일반 배열)을 한 번에 훑어 시간별 밴드/소품 마스크 계산
+// recommendOutfit과 같은 규칙을 사용하며, 기온이 없는 시간은 NO_BAND로 표시
+export function recommendHourly(
+  { tempC, humidity, uvIndex, precipitationMm, precipitationProbability, pm25, pm10, airQualityIndex },
+  { temperatureRange = null } = {},
+) {
+  const length = tempC.length;
+  const bands = new Uint8Array(length);
+  const masks = new Uint16Array(length);
+  const wideRange = typeof temperatureRange === "number" && temperatureRange >= 10 ? MUFFLER : 0;
+
+  for (let i = 0; i < length; i += 1) {
+    const temp = tempC[i];
+    if (temp == null || Number.isNaN(temp)) {
+      bands[i] = NO_BAND;
+      continue;
+    }
+    bands[i] = selectBandIndex(temp);
+
+    const uv = uvIndex?.[i];
+    let mask = wideRange;
+    if (uv >= 3) mask |= SUNSCREEN;
+    if (uv >= 6) mask |= SUN_GEAR;
+    if (precipitationProbability?.[i] >= 50 || precipitationMm?.[i] >= 0.2) mask |= UMBRELLA;
+    if (temp <= 8) mask |= WARM_GEAR;
+    if (pm25?.[i] >= 35 || pm10?.[i] >= 80 || airQualityIndex?.[i] >= 80) mask |= MASK;
+    masks[i] = mask;
+  }
+
+  return { bands, masks };
+}
+
+const DAY_PREFIXES = ["", "내일 ", "모레 "];
+
+function formatHour(time, offsetHours = 0) {
+  const hour = Number(String(time).slice(11, 13)) + offsetHours;
+  return String(hour).padStart(2, "0");
+}
+
+// 시간별 예보는 1시간 간격으로 이어지므로 "T00:00"이면 날짜가 바뀐 것으로 판단
+function isMidnight(time) {
+  return String(time).startsWith("00", 11);
+}
+
+// 첫 시각의 날짜를 기준으로 다음 날부터 "내일 ", "모레 ", 그 이후는 "MM/DD " 표시
+function dayPrefix(day, time) {
+  if (day === 0) return "";
+  return DAY_PREFIXES[day] ?? `${String(time).slice(5, 10).replace("-", "/")} `;
+}
+
+// 밴드와 소품이 같은 연속 시간을 하나의 구간으로 묶음 (예: "09–13 자켓/후드, 13–18 반팔 + 반바지 + 우산")
+// 구간은 자정에서 나누고, 다음 날 구간에는 "내일 00–12 ..."처럼 날짜 표시를 붙임
+export function collapseTimeline(time, { bands, masks }) {
+  const segments = [];
+  let start = -1;
+  let startDay = 0;
+  let day = 0;
+
+  for (let i = 0; i <= bands.length; i += 1) {
+    const newDay = i > 0 && i < bands.length && isMidnight(time[i]);
+    if (newDay) day += 1;
+
+    const boundary =
+      i === bands.length ||
+      bands[i] === NO_BAND ||
+      (start !== -1 && (newDay || bands[i] !== bands[start] || masks[i] !== masks[start]));
+
+    if (boundary && start !== -1) {
+      const band = OUTFIT_BANDS[bands[start]];
+      const accessories = accessoriesFromMask(masks[start]);
+      const from = formatHour(time[start]);
+      const to = formatHour(time[i - 1], 1);
+      segments.push({
+        from: time[start],
+        to: time[i - 1],
+        bandKey: band.key,
+        outfitLabel: band.label,
+        accessories,
+        label: `${dayPrefix(startDay, time[start])}${from}–${to} ${band.label}${accessories.length > 0 ? ` + ${accessories.join(", ")}` : ""}`,
+      });
+      start = -1;
+    }
+
+    if (i < bands.length && bands[i] !== NO_BAND && start === -1) {
+      start = i;
+      startDay = day;
+    }
+  }
+
+  return {
+    segments,
+    summary: segments.map((segment) => segment.label).join(", "),
+  };
+}
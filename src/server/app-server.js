@@ -1,24 +1,24 @@
 import http from "node:http";
-import { promises as fs } from "node:fs";
 import path from "node:path";
 import { fileURLToPath } from "node:url";
-import { recommendOutfit } from "../recommendation.js";
+import { collapseTimeline, recommendHourly, recommendOutfit } from "../recommendation.js";
+import { createBatchLoader } from "./batch-loader.js";
+import { createGeocoder, loadGazetteer } from "./geocoder.js";
+import { createMetrics } from "./metrics.js";
+import { createCircuitBreaker, firstAvailable, upstreamError, withDeadline, withFetchTimeout } from "./resilience.js";
+import { DEFAULT_SNAPSHOT_FILE, buildSnapshot, loadSnapshotFile, openSnapshot, selectSnapshotLocations } from "./snapshot.js";
+import { createSnapshotStoreFromEnv } from "./snapshot-store.js";
+import { createStaticAssets } from "./static-assets.js";
+import { createUpstreamCache } from "./upstream-cache.js";
 
 const __filename = fileURLToPath(import.meta.url);
 const __dirname = path.dirname(__filename);
 const PROJECT_ROOT = path.resolve(__dirname, "../..");
+const PUBLIC_ROOT = path.join(PROJECT_ROOT, "public");
 
-const STATIC_TYPES = {
-  ".html": "text/html; charset=utf-8",
-  ".css": "text/css; charset=utf-8",
-  ".js": "application/javascript; charset=utf-8",
-  ".svg": "image/svg+xml",
-  ".json": "application/json; charset=utf-8",
-};
-
-function json(res, code, payload) {
-  res.writeHead(code, { "Content-Type": "application/json; charset=utf-8" });
-  res.end(JSON.stringify(payload));
+function json(res, code, payload, headers = {}) {
+  res.writeHead(code, { "Content-Type": "application/json; charset=utf-8", ...headers });
+  res.end(typeof payload === "string" ? payload : JSON.stringify(payload));
 }
 
 function text(res, code, payload) {
@@ -26,6 +26,55 @@ function text(res, code, payload) {
   res.end(payload);
 }
 
+// ?stream=ndjson|sse 또는 Accept 헤더로 스트리밍 응답 여부 결정 (기본은 기존 JSON 일괄 응답)
+function resolveStreamFormat(req) {
+  const query = new URL(req.url || "/", "http://localhost").searchParams.get("stream");
+  const accept = req.headers?.accept || "";
+
+  if (query === "sse" || accept.includes("text/event-stream")) {
+    return "sse";
+  }
+  if (query === "ndjson" || accept.includes("application/x-ndjson")) {
+    return "ndjson";
+  }
+  return null;
+}
+
+function writeStreamEvent(res, format, type, payload) {
+  if (format === "sse") {
+    res.write(`event: ${type}\ndata: ${JSON.stringify(payload)}\n\n`);
+  } else {
+    res.write(`${JSON.stringify({ type, ...payload })}\n`);
+  }
+}
+
+async function streamCards(res, format, tasks) {
+  res.writeHead(200, {
+    "Content-Type":
+      format === "sse" ? "text/event-stream; charset=utf-8" : "application/x-ndjson; charset=utf-8",
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+  });
+  res.flushHeaders();
+
+  // 카드 순서는 index로 전달하고, 완료되는 순서대로 기록
+  await Promise.all(
+    tasks.map((task, index) =>
+      task.then(
+        (card) => writeStreamEvent(res, format, "card", { index, card }),
+        (error) =>
+          writeStreamEvent(res, format, "error", {
+            index,
+            message: error?.message || "서버 오류가 발생했습니다.",
+          }),
+      ),
+    ),
+  );
+
+  writeStreamEvent(res, format, "done", { count: tasks.length });
+  res.end();
+}
+
 function parseRequestBody(req) {
   return new Promise((resolve, reject) => {
     let raw = "";
@@ -53,10 +102,36 @@ function parseRequestBody(req) {
 
 // File read/write logic has been removed for Vercel Serverless compatibility.
 
-async function fetchCurrentWeather(fetchImpl, { latitude, longitude }) {
+function appendCoordinates(endpoint, locations) {
+  endpoint.searchParams.set("latitude", locations.map((location) => String(location.latitude)).join(","));
+  endpoint.searchParams.set("longitude", locations.map((location) => String(location.longitude)).join(","));
+}
+
+function isCoordinate(value, limit) {
+  if (typeof value !== "number" && (typeof value !== "string" || value.trim() === "")) {
+    return false;
+  }
+  const number = Number(value);
+  return Number.isFinite(number) && Math.abs(number) <= limit;
+}
+
+// 배치 요청은 좌표 하나만 잘못돼도 Open-Meteo가 400으로 전체를 거절하므로 묶기 전에 걸러낸다
+function hasValidCoordinates(location) {
+  return isCoordinate(location?.latitude, 90) && isCoordinate(location?.longitude, 180);
+}
+
+// Open-Meteo는 좌표가 여러 개면 배열, 하나면 단일 객체로 응답
+function splitBatchPayload(data, expectedLength) {
+  const results = Array.isArray(data) ? data : [data];
+  if (results.length !== expectedLength) {
+    throw new Error("날씨 데이터 형식이 올바르지 않습니다.");
+  }
+  return results;
+}
+
+async function fetchCurrentWeatherBatch(fetchImpl, locations) {
   const endpoint = new URL("https://api.open-meteo.com/v1/forecast");
-  endpoint.searchParams.set("latitude", String(latitude));
-  endpoint.searchParams.set("longitude", String(longitude));
+  appendCoordinates(endpoint, locations);
   endpoint.searchParams.set(
     "current",
     "temperature_2m,relative_humidity_2m,uv_index,precipitation",
@@ -65,16 +140,29 @@ async function fetchCurrentWeather(fetchImpl, { latitude, longitude }) {
     "daily",
     "precipitation_probability_max,temperature_2m_max,temperature_2m_min,uv_index_max,precipitation_sum",
   );
-  endpoint.searchParams.set("hourly", "temperature_2m");
+  endpoint.searchParams.set(
+    "hourly",
+    "temperature_2m,relative_humidity_2m,uv_index,precipitation,precipitation_probability",
+  );
   endpoint.searchParams.set("forecast_days", "2");
   endpoint.searchParams.set("timezone", "auto");
 
   const response = await fetchImpl(endpoint);
   if (!response.ok) {
-    throw new Error("날씨 API 요청에 실패했습니다.");
+    throw upstreamError("날씨 API 요청에 실패했습니다.", response);
   }
 
-  const data = await response.json();
+  const results = splitBatchPayload(await response.json(), locations.length);
+  return results.map((data) => {
+    try {
+      return parseCurrentWeather(data);
+    } catch (error) {
+      return error;
+    }
+  });
+}
+
+function parseCurrentWeather(data) {
   if (!data?.current || !data?.daily) {
     throw new Error("날씨 데이터 형식이 올바르지 않습니다.");
   }
@@ -103,6 +191,7 @@ async function fetchCurrentWeather(fetchImpl, { latitude, longitude }) {
     airQualityIndex: null,
     updatedAt: data.current.time ?? new Date().toISOString(),
     timezone: data.timezone ?? null,
+    hourly: extractHourlyColumns(data.hourly),
     tomorrow: {
       tempMax: tomorrowMax,
       tempMin: tomorrowMin,
@@ -115,6 +204,65 @@ async function fetchCurrentWeather(fetchImpl, { latitude, longitude }) {
   };
 }
 
+// 시간별 예보를 recommendHourly가 받는 열 단위 Float64Array로 변환 (누락 값은 NaN)
+function extractHourlyColumns(hourly) {
+  const time = Array.isArray(hourly?.time) ? hourly.time : [];
+  if (time.length === 0) {
+    return null;
+  }
+
+  const column = (values) => {
+    const result = new Float64Array(time.length).fill(Number.NaN);
+    if (Array.isArray(values)) {
+      for (let i = 0; i < result.length; i += 1) {
+        if (typeof values[i] === "number") result[i] = values[i];
+      }
+    }
+    return result;
+  };
+
+  return {
+    time,
+    tempC: column(hourly.temperature_2m),
+    humidity: column(hourly.relative_humidity_2m),
+    uvIndex: column(hourly.uv_index),
+    precipitationMm: column(hourly.precipitation),
+    precipitationProbability: column(hourly.precipitation_probability),
+  };
+}
+
+// 현재 시각부터 남은 예보 시간(최대 48시간)의 옷차림 변화 구간
+function buildHourlyTimeline(hourly, weather) {
+  if (!hourly) {
+    return null;
+  }
+
+  const currentHour = String(weather.updatedAt || "").slice(0, 13);
+  let start = 0;
+  while (start < hourly.time.length && String(hourly.time[start]).slice(0, 13) < currentHour) {
+    start += 1;
+  }
+
+  // 시간별 대기질은 조회하지 않으므로 현재 대기질 값을 모든 시간에 적용
+  const airColumn = (value) =>
+    typeof value === "number" ? new Float64Array(hourly.time.length - start).fill(value) : null;
+
+  const hourlyRecommendation = recommendHourly(
+    {
+      tempC: hourly.tempC.subarray(start),
+      humidity: hourly.humidity.subarray(start),
+      uvIndex: hourly.uvIndex.subarray(start),
+      precipitationMm: hourly.precipitationMm.subarray(start),
+      precipitationProbability: hourly.precipitationProbability.subarray(start),
+      pm25: airColumn(weather.pm25),
+      pm10: airColumn(weather.pm10),
+      airQualityIndex: airColumn(weather.airQualityIndex),
+    },
+    { temperatureRange: weather.temperatureRange },
+  );
+  return collapseTimeline(hourly.time.slice(start), hourlyRecommendation);
+}
+
 function resolveTemperatureRange(data) {
   const dailyMax = data?.daily?.temperature_2m_max?.[0];
   const dailyMin = data?.daily?.temperature_2m_min?.[0];
@@ -138,40 +286,40 @@ function resolveTemperatureRange(data) {
   return maxTemp - minTemp;
 }
 
-async function fetchAirQuality(fetchImpl, { latitude, longitude, timezone }) {
+async function fetchAirQualityBatch(fetchImpl, locations) {
   const endpoint = new URL("https://air-quality-api.open-meteo.com/v1/air-quality");
-  endpoint.searchParams.set("latitude", String(latitude));
-  endpoint.searchParams.set("longitude", String(longitude));
+  appendCoordinates(endpoint, locations);
   endpoint.searchParams.set("current", "pm2_5,pm10,us_aqi");
-  endpoint.searchParams.set("timezone", timezone || "auto");
+  endpoint.searchParams.set("timezone", "auto");
 
   const response = await fetchImpl(endpoint);
   if (!response.ok) {
-    return fetchAirQualityFromHourly(fetchImpl, { latitude, longitude, timezone });
+    throw upstreamError("대기질 API 요청에 실패했습니다.", response);
   }
 
-  const data = await response.json();
-  if (data?.current) {
+  const results = splitBatchPayload(await response.json(), locations.length);
+  return results.map((data) => {
+    if (!data?.current) {
+      return null;
+    }
     return {
       pm25: typeof data.current.pm2_5 === "number" ? data.current.pm2_5 : null,
       pm10: typeof data.current.pm10 === "number" ? data.current.pm10 : null,
       airQualityIndex: typeof data.current.us_aqi === "number" ? data.current.us_aqi : null,
     };
-  }
-
-  return fetchAirQualityFromHourly(fetchImpl, { latitude, longitude, timezone });
+  });
 }
 
-async function fetchAirQualityFromHourly(fetchImpl, { latitude, longitude, timezone }) {
+async function fetchAirQualityFromHourly(fetchImpl, { latitude, longitude, timezone }, signal) {
   const endpoint = new URL("https://air-quality-api.open-meteo.com/v1/air-quality");
   endpoint.searchParams.set("latitude", String(latitude));
   endpoint.searchParams.set("longitude", String(longitude));
   endpoint.searchParams.set("hourly", "pm2_5,pm10,us_aqi");
   endpoint.searchParams.set("timezone", timezone || "auto");
 
-  const response = await fetchImpl(endpoint);
+  const response = await fetchImpl(endpoint, { signal });
   if (!response.ok) {
-    return null;
+    throw upstreamError("대기질 API 요청에 실패했습니다.", response);
   }
 
   const data = await response.json();
@@ -236,14 +384,14 @@ function buildFallbackWeather(reason = "외부 날씨 API 연결 실패") {
   };
 }
 
-async function fetchAirQualityFromWaqi(fetchImpl, { latitude, longitude }) {
+async function fetchAirQualityFromWaqi(fetchImpl, { latitude, longitude }, signal) {
   const token = process.env.WAQI_TOKEN || "demo";
   const endpoint = new URL(`https://api.waqi.info/feed/geo:${latitude};${longitude}/`);
   endpoint.searchParams.set("token", token);
 
-  const response = await fetchImpl(endpoint);
+  const response = await fetchImpl(endpoint, { signal });
   if (!response.ok) {
-    return null;
+    throw upstreamError("대기질 API 요청에 실패했습니다.", response);
   }
 
   const data = await response.json();
@@ -266,141 +414,429 @@ async function fetchAirQualityFromWaqi(fetchImpl, { latitude, longitude }) {
   };
 }
 
-function safeFilePath(urlPath) {
-  const pathname = decodeURIComponent(urlPath.split("?")[0]);
-  const target = pathname === "/" ? "/index.html" : pathname;
-  const fullPath = path.resolve(PROJECT_ROOT, `.${target}`);
-
-  if (!fullPath.startsWith(PROJECT_ROOT)) {
-    return null;
+function buildRecommendations(weather, hourly, weatherSource) {
+  const recommendation = recommendOutfit(weather);
+  if (weatherSource === "fallback") {
+    const fallbackMsg = "실시간 날씨 연결이 불안정해 임시 날씨 값으로 추천합니다.";
+    if (recommendation.items && recommendation.items.length > 0) {
+      recommendation.items[0].note = recommendation.items[0].note
+        ? fallbackMsg + " " + recommendation.items[0].note
+        : fallbackMsg;
+    }
   }
 
-  if (fullPath.includes(`${path.sep}data${path.sep}`)) {
-    return null;
+  let tomorrowRecommendation = null;
+  if (weather.tomorrow && weather.tomorrow.tempAvg != null) {
+    tomorrowRecommendation = recommendOutfit({
+      tempC: weather.tomorrow.tempAvg,
+      humidity: weather.humidity, // 내일 습도는 알 수 없으므로 오늘 습도를 임의로(또는 기본값) 유지
+      uvIndex: weather.tomorrow.uvIndex ?? 0,
+      precipitationMm: weather.tomorrow.precipitationMm ?? 0,
+      precipitationProbability: weather.tomorrow.precipitationProbability ?? 0,
+      temperatureRange: weather.tomorrow.temperatureRange ?? null,
+    });
   }
 
-  return fullPath;
+  const timeline = buildHourlyTimeline(hourly, weather);
+  return { recommendation, tomorrowRecommendation, timeline };
 }
 
-async function serveStatic(req, res) {
-  const fullPath = safeFilePath(req.url || "/");
-  if (!fullPath) {
-    text(res, 403, "Forbidden");
-    return;
+// 인기 위치의 예보/대기질을 배치로 조회해 스냅샷 파일 내용(Buffer)을 만든다 (CLI와 예약 실행 경로 공용)
+export function buildRecommendationSnapshot({ fetchImpl = fetch, locations, ...options }) {
+  return buildSnapshot({
+    locations,
+    fetchWeatherBatch: (batch) => fetchCurrentWeatherBatch(fetchImpl, batch),
+    fetchAirQualityBatch: (batch) => fetchAirQualityBatch(fetchImpl, batch),
+    ...options,
+  });
+}
+
+export function createHandler({
+  fetchImpl = fetch,
+  cache = createUpstreamCache(),
+  breaker = createCircuitBreaker(),
+  batchWindowMs = 5,
+  requestBudgetMs = 3_000,
+  upstreamTimeoutMs = 2_500,
+  hedgeDelayMs = 400,
+  maxConcurrentHedges = 4,
+  staticRoot = null,
+  metrics = createMetrics({ sampleRate: Number(process.env.METRICS_SAMPLE_RATE ?? 1) }),
+  geocoder = null,
+  // 배포에 포함된 파일(선택)로 시작하고, 공유 저장소에 더 최근 스냅샷이 있으면 교체
+  snapshot = loadSnapshotFile(process.env.WEATHER_SNAPSHOT_FILE || DEFAULT_SNAPSHOT_FILE),
+  snapshotStore = createSnapshotStoreFromEnv(),
+  snapshotLoadTimeoutMs = 300,
+  snapshotCheckIntervalMs = 60_000,
+} = {}) {
+  const guardedFetch = withFetchTimeout(metrics.instrumentFetch(fetchImpl), upstreamTimeoutMs);
+  const placeSearch =
+    geocoder ??
+    createGeocoder({
+      fetchImpl: guardedFetch,
+      callUpstream: (task) => breaker.call("geocoding-api.open-meteo.com", task),
+    });
+
+  metrics.addCollector(() => {
+    const cacheStats = cache.stats();
+    return [
+      ...["hits", "staleHits", "misses", "coalesced", "revalidations", "evictions", "errors"].map((event) => ({
+        name: "weather_cache_events_total",
+        type: "counter",
+        help: "외부 API 캐시 이벤트 수",
+        labels: { event },
+        value: cacheStats[event],
+      })),
+      { name: "weather_cache_entries", type: "gauge", help: "캐시 항목 수", value: cacheStats.entries },
+      { name: "weather_cache_bytes", type: "gauge", help: "캐시 추정 메모리(바이트)", value: cacheStats.bytes },
+      ...Object.entries(breaker.stats()).map(([host, circuit]) => ({
+        name: "weather_circuit_open",
+        type: "gauge",
+        help: "회로 차단 상태(1=차단)",
+        labels: { host },
+        value: circuit.state === "open" ? 1 : 0,
+      })),
+    ];
+  });
+
+  // Vercel에서는 public/을 정적 빌드가 직접 서빙하므로 staticRoot가 지정된 경우(로컬 서버)에만 사용
+  const staticAssets = staticRoot ? createStaticAssets({ root: staticRoot }) : null;
+  staticAssets?.warm();
+
+  // 같은 요청 및 동시 요청의 위치를 묶어 예보/대기질을 각각 한 번의 호출로 조회
+  // 배치 호출은 위치 수와 관계없이 회로 차단기에 한 번의 성공/실패로 집계
+  const weatherLoader = createBatchLoader(
+    (batch) => breaker.call("api.open-meteo.com", () => fetchCurrentWeatherBatch(guardedFetch, batch)),
+    { windowMs: batchWindowMs },
+  );
+  const airQualityLoader = createBatchLoader(
+    (batch) =>
+      breaker.call("air-quality-api.open-meteo.com", () => fetchAirQualityBatch(guardedFetch, batch)),
+    { windowMs: batchWindowMs },
+  );
+
+  // 시작 시 읽어 둔 스냅샷이 유효하면 인기 위치는 외부 호출 없이 응답
+  let currentSnapshot = snapshot;
+  let snapshotLoad = null;
+  let lastSnapshotCheck = 0;
+
+  function adoptSnapshot(next) {
+    if (next && (!currentSnapshot || next.createdAt > currentSnapshot.createdAt)) {
+      currentSnapshot = next;
+    }
+  }
+
+  // 공유 저장소 읽기는 인스턴스 시작 시 한 번, 이후에는 스냅샷이 만료됐을 때만 (최소 간격 유지)
+  function loadSnapshotFromStore() {
+    if (!snapshotStore) return null;
+    if (snapshotLoad) return snapshotLoad;
+    if (lastSnapshotCheck > 0 && Date.now() - lastSnapshotCheck < snapshotCheckIntervalMs) return null;
+
+    lastSnapshotCheck = Date.now();
+    snapshotLoad = snapshotStore
+      .load()
+      .then((buffer) => {
+        adoptSnapshot(buffer ? openSnapshot(buffer) : null);
+        return buffer ? "ok" : "empty";
+      })
+      .catch(() => "error")
+      .then((outcome) => {
+        metrics.increment("weather_snapshot_loads_total", "공유 저장소 스냅샷 읽기 결과", { outcome });
+      })
+      .finally(() => {
+        snapshotLoad = null;
+      });
+    return snapshotLoad;
   }
 
-  try {
-    const stats = await fs.stat(fullPath);
-    if (!stats.isFile()) {
-      text(res, 404, "Not Found");
-      return;
+  // 스냅샷이 없거나 만료됐으면 저장소 응답을 잠깐(snapshotLoadTimeoutMs)만 기다림
+  async function ensureSnapshot() {
+    if (currentSnapshot?.isFresh()) return;
+    const pending = loadSnapshotFromStore();
+    if (pending) {
+      await withDeadline(pending, snapshotLoadTimeoutMs, () => null);
     }
+  }
+
+  loadSnapshotFromStore();
 
-    const ext = path.extname(fullPath);
-    const type = STATIC_TYPES[ext] || "application/octet-stream";
-    const content = await fs.readFile(fullPath);
-    res.writeHead(200, { "Content-Type": type });
-    res.end(content);
-  } catch {
-    text(res, 404, "Not Found");
+  function fromSnapshot(location, kind) {
+    if (!currentSnapshot?.isFresh()) {
+      return null;
+    }
+    const record = currentSnapshot.lookup(location);
+    if (record) {
+      metrics.increment("weather_snapshot_hits_total", "스냅샷으로 응답한 조회 수", { kind });
+    }
+    return record;
   }
-}
 
-export default async function handler(req, res) {
-  const method = req.method || "GET";
-  const urlPath = req.url || "/";
+  function loadWeather(location) {
+    if (!hasValidCoordinates(location)) {
+      return Promise.reject(new Error("위치 좌표가 올바르지 않습니다."));
+    }
+    return cache.get(
+      "weather",
+      location,
+      () => fromSnapshot(location, "weather")?.weather ?? weatherLoader.load(location),
+    );
+  }
+
+  // 미리 시작하는 대체 소스(hedge)는 동시에 maxConcurrentHedges개까지만 허용
+  // 배치 호출 하나가 느릴 때 위치마다 hourly/WAQI 호출이 한꺼번에 나가지 않도록 함
+  let activeHedges = 0;
+  function acquireHedge() {
+    if (activeHedges >= maxConcurrentHedges) {
+      return null;
+    }
+    activeHedges += 1;
+    return () => {
+      activeHedges -= 1;
+    };
+  }
+
+  // 배치 current -> 위치별 hourly -> WAQI 순서로 시도하되, 느린 소스는 hedgeDelayMs 뒤 다음 소스와 경쟁
+  // 결과에 어떤 경로로 얻었는지(source)를 붙여 반환하고, 먼저 응답한 소스가 있으면 나머지 호출은 취소
+  function loadAirQuality(location) {
+    if (!hasValidCoordinates(location)) {
+      return Promise.resolve(null);
+    }
+    const snapshotAirQuality = fromSnapshot(location, "air_quality")?.airQuality;
+    if (snapshotAirQuality) {
+      return Promise.resolve({ source: "snapshot", value: snapshotAirQuality });
+    }
+
+    const coordinates = { latitude: location.latitude, longitude: location.longitude };
+    const tagged = (source, task) => (signal) =>
+      task(signal).then((value) => (value == null ? null : { source, value }));
+    return firstAvailable(
+      [
+        tagged("current", () => cache.get("airQuality", location, () => airQualityLoader.load(location))),
+        // 외부 호출은 캐시가 준 signal로 실행해, 같은 호출을 기다리는 다른 요청이나 백그라운드 갱신이
+        // 남아 있으면 이 요청의 hedge가 끝나도 취소되지 않게 함
+        tagged("hourly", (signal) =>
+          cache.get(
+            "airQualityHourly",
+            location,
+            (loadSignal) =>
+              breaker.call("air-quality-api.open-meteo.com", () =>
+                fetchAirQualityFromHourly(guardedFetch, coordinates, loadSignal),
+              ),
+            { signal },
+          ),
+        ),
+        // WAQI demo 토큰은 데이터가 없을 때 오류 대신 빈 응답을 주므로 빈 응답도 실패로 집계
+        tagged("waqi", (signal) =>
+          cache.get(
+            "waqi",
+            location,
+            (loadSignal) =>
+              breaker.call("api.waqi.info", () => fetchAirQualityFromWaqi(guardedFetch, coordinates, loadSignal), {
+                emptyIsFailure: true,
+              }),
+            { signal },
+          ),
+        ),
+      ],
+      { hedgeDelayMs, acquireHedge },
+    );
+  }
 
-  // Vercel 환경에서는 /data 작성이 불가능할 수 있으므로 읽기 전용으로 fallback
-  const fetchImpl = fetch;
+  function countFallback(path) {
+    metrics.increment("weather_fallback_total", "폴백 경로 사용 횟수", { path });
+  }
 
-  try {
-    if (urlPath === "/api/health" && method === "GET") {
-      json(res, 200, { ok: true });
-      return;
+  async function buildCard(location, deadline, timing) {
+    // 날씨와 대기질을 동시에 조회하고, 요청 시간 예산을 넘기면 기다리지 않는다
+    const weatherTask = loadWeather(location);
+    const airQualityTask = loadAirQuality(location);
+
+    let weather;
+    let hourly = null;
+    let weatherSource = "live";
+    let timedOut = false;
+
+    try {
+      // 캐시된 객체는 여러 요청이 공유하므로 복사본에만 대기질 값을 채운다
+      // 시간별 열 데이터는 타임라인 계산에만 쓰고 응답 카드에는 넣지 않는다
+      ({ hourly = null, ...weather } = await timing.time(
+        "weather",
+        withDeadline(weatherTask, deadline - Date.now(), () => {
+          timedOut = true;
+          throw new Error("날씨 API 응답 시간이 초과되었습니다.");
+        }),
+      ));
+    } catch (error) {
+      weather = buildFallbackWeather(error?.message || "외부 날씨 API 연결 실패");
+      weatherSource = "fallback";
+      countFallback(timedOut ? "weather_timeout" : "weather_error");
     }
 
-    // 클라이언트로부터 배열을 전달받아 상태없이(Stateless) 추천 API 연산
-    if (urlPath.includes("/api/recommendations") && method === "POST") {
-      const body = await parseRequestBody(req);
-      const locations = Array.isArray(body.locations) ? body.locations : [];
-
-      const cards = await Promise.all(
-        locations.map(async (location) => {
-          let weather;
-          let weatherSource = "live";
-
-          try {
-            weather = await fetchCurrentWeather(fetchImpl, location);
-          } catch (error) {
-            weather = buildFallbackWeather(error?.message || "외부 날씨 API 연결 실패");
-            weatherSource = "fallback";
-          }
-
-          let airQuality = null;
-          if (weatherSource === "live") {
-            airQuality = await fetchAirQuality(fetchImpl, {
-              latitude: location.latitude,
-              longitude: location.longitude,
-              timezone: weather.timezone,
-            });
-            if (!airQuality) {
-              airQuality = await fetchAirQualityFromWaqi(fetchImpl, {
-                latitude: location.latitude,
-                longitude: location.longitude,
-              });
-            }
-          }
-
-          if (airQuality) {
-            weather.pm25 = airQuality.pm25;
-            weather.pm10 = airQuality.pm10;
-            weather.airQualityIndex = airQuality.airQualityIndex;
-          }
-
-          if (typeof weather.temperatureRange === "number") {
-            weather.temperatureRange = coerceTemperatureRange(weather.temperatureRange);
-          }
-          weather.updatedAt = weather.updatedAt || new Date().toISOString();
-          const recommendation = recommendOutfit(weather);
-          if (weatherSource === "fallback") {
-            const fallbackMsg = "실시간 날씨 연결이 불안정해 임시 날씨 값으로 추천합니다.";
-            if (recommendation.items && recommendation.items.length > 0) {
-              recommendation.items[0].note = recommendation.items[0].note
-                ? fallbackMsg + " " + recommendation.items[0].note
-                : fallbackMsg;
-            }
-          }
-
-          let tomorrowRecommendation = null;
-          if (weather.tomorrow && weather.tomorrow.tempAvg != null) {
-            tomorrowRecommendation = recommendOutfit({
-              tempC: weather.tomorrow.tempAvg,
-              humidity: weather.humidity, // 내일 습도는 알 수 없으므로 오늘 습도를 임의로(또는 기본값) 유지
-              uvIndex: weather.tomorrow.uvIndex ?? 0,
-              precipitationMm: weather.tomorrow.precipitationMm ?? 0,
-              precipitationProbability: weather.tomorrow.precipitationProbability ?? 0,
-              temperatureRange: weather.tomorrow.temperatureRange ?? null,
-            });
-          }
-
-          return { ...location, weather, recommendation, tomorrowRecommendation };
+    if (weatherSource === "live") {
+      timedOut = false;
+      const airQuality = await timing.time(
+        "air_quality",
+        withDeadline(airQualityTask, deadline - Date.now(), () => {
+          timedOut = true;
+          return null;
         }),
       );
 
-      json(res, 200, { cards, count: cards.length });
-      return;
+      if (airQuality) {
+        weather.pm25 = airQuality.value.pm25;
+        weather.pm10 = airQuality.value.pm10;
+        weather.airQualityIndex = airQuality.value.airQualityIndex;
+        if (!["current", "snapshot"].includes(airQuality.source)) countFallback(`air_quality_${airQuality.source}`);
+      } else {
+        countFallback(timedOut ? "air_quality_timeout" : "air_quality_none");
+      }
     }
 
-    json(res, 404, { message: "Not Found API route" });
-  } catch (error) {
-    json(res, 500, { message: error?.message || "서버 오류가 발생했습니다." });
+    if (typeof weather.temperatureRange === "number") {
+      weather.temperatureRange = coerceTemperatureRange(weather.temperatureRange);
+    }
+    weather.updatedAt = weather.updatedAt || new Date().toISOString();
+
+    const { recommendation, tomorrowRecommendation, timeline } = timing.measure("recommend", () =>
+      buildRecommendations(weather, hourly, weatherSource),
+    );
+
+    if (staticAssets) {
+      // 내용 해시 URL로 바꿔 의상 이미지를 immutable 캐시로 받게 함
+      recommendation.image = staticAssets.versionedPath(recommendation.image);
+      if (tomorrowRecommendation) {
+        tomorrowRecommendation.image = staticAssets.versionedPath(tomorrowRecommendation.image);
+      }
+    }
+
+    return { ...location, weather, recommendation, tomorrowRecommendation, timeline };
   }
+
+  return async function handler(req, res) {
+    const method = req.method || "GET";
+    const urlPath = req.url || "/";
+
+    try {
+      if (urlPath === "/api/health" && method === "GET") {
+        json(res, 200, {
+          ok: true,
+          cache: cache.stats(),
+          breakers: breaker.stats(),
+          snapshot: currentSnapshot
+            ? {
+                count: currentSnapshot.count,
+                createdAt: new Date(currentSnapshot.createdAt).toISOString(),
+                fresh: currentSnapshot.isFresh(),
+              }
+            : null,
+        });
+        return;
+      }
+
+      // Vercel Cron 예약 실행: 스냅샷을 새로 만들어 공유 저장소에 기록 (새 인스턴스는 시작 시 여기서 읽음)
+      if (urlPath === "/api/cron/refresh-snapshot" && method === "GET") {
+        const secret = process.env.CRON_SECRET;
+        if (!secret || req.headers?.authorization !== `Bearer ${secret}`) {
+          json(res, 401, { message: "인증되지 않은 요청입니다." });
+          return;
+        }
+
+        const locations = selectSnapshotLocations({
+          gazetteer: loadGazetteer(),
+          top: Number(process.env.SNAPSHOT_TOP_N ?? 50),
+        });
+        const { buffer, count } = await buildRecommendationSnapshot({ fetchImpl: guardedFetch, locations });
+        if (count === 0) {
+          json(res, 502, { message: "스냅샷에 넣을 위치를 하나도 조회하지 못했습니다." });
+          return;
+        }
+        const refreshed = openSnapshot(buffer);
+        await snapshotStore?.save(buffer, { ttlMs: refreshed.maxAgeMs });
+        adoptSnapshot(refreshed);
+        json(res, 200, {
+          ok: true,
+          count,
+          createdAt: new Date(refreshed.createdAt).toISOString(),
+          stored: Boolean(snapshotStore),
+        });
+        return;
+      }
+
+      // 위치 자동완성/검색: 접두어 색인에서 먼저 찾고 count개가 안 되면 Open-Meteo 지오코딩 결과와 합침
+      if (urlPath.startsWith("/api/geocode") && method === "GET") {
+        const params = new URL(urlPath, "http://localhost").searchParams;
+        const query = params.get("name") || "";
+        const count = Math.min(Math.max(Number.parseInt(params.get("count"), 10) || 5, 1), 20);
+        const { results, source, degraded = false } = await placeSearch.search(query, {
+          count,
+          language: params.get("language") || "en",
+        });
+        metrics.increment("weather_geocode_requests_total", "위치 검색 요청 수", { source });
+        // 외부 호출 실패로 색인 결과만 준 응답은 캐시하지 않아 복구 후 바로 전체 결과를 받게 함
+        json(res, 200, { results, source }, { "Cache-Control": degraded ? "no-store" : "public, max-age=3600" });
+        return;
+      }
+
+      if (urlPath === "/api/metrics" && method === "GET") {
+        res.writeHead(200, { "Content-Type": "text/plain; version=0.0.4; charset=utf-8" });
+        res.end(metrics.render());
+        return;
+      }
+
+      // 클라이언트로부터 배열을 전달받아 상태없이(Stateless) 추천 API 연산
+      if (urlPath.includes("/api/recommendations") && method === "POST") {
+        const body = await parseRequestBody(req);
+        const locations = Array.isArray(body.locations) ? body.locations : [];
+        const deadline = Date.now() + requestBudgetMs;
+
+        // 스트리밍을 요청한 클라이언트에는 준비된 카드부터 바로 전송
+        const streamFormat = resolveStreamFormat(req);
+        const timing = metrics.startRequest("recommendations");
+        metrics.increment("weather_recommendation_requests_total", "추천 API 요청 수", {
+          format: streamFormat ?? "json",
+        });
+        await timing.time("snapshot", ensureSnapshot());
+
+        if (streamFormat) {
+          await streamCards(
+            res,
+            streamFormat,
+            locations.map((location) => buildCard(location, deadline, timing)),
+          );
+          timing.finish();
+          return;
+        }
+
+        const cards = await Promise.all(locations.map((location) => buildCard(location, deadline, timing)));
+        const payload = timing.measure("serialize", () => JSON.stringify({ cards, count: cards.length }));
+        const serverTiming = timing.header();
+
+        json(res, 200, payload, serverTiming ? { "Server-Timing": serverTiming } : {});
+        timing.finish();
+        return;
+      }
+
+      if (staticAssets && !urlPath.startsWith("/api/") && (method === "GET" || method === "HEAD")) {
+        await staticAssets.serve(req, res);
+        return;
+      }
+
+      json(res, 404, { message: "Not Found API route" });
+    } catch (error) {
+      json(res, 500, { message: error?.message || "서버 오류가 발생했습니다." });
+    }
+  };
 }
 
+// 서버리스 인스턴스가 재사용되는 동안 캐시를 공유하도록 모듈 단위로 하나만 생성
+const handler = createHandler();
+export default handler;
+
 // For local testing compatibility 
 export function createWeatherServer({
   dataFile = path.resolve(process.cwd(), "data", "locations.json"),
-  fetchImpl = fetch,
+  ...options
 } = {}) {
-  return http.createServer((req, res) => handler(req, res));
+  const serverHandler = createHandler({ staticRoot: PUBLIC_ROOT, ...options });
+  return http.createServer((req, res) => serverHandler(req, res));
 }
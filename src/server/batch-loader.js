@@ -0,0 +1,48 @@
+// 짧은 시간 창(windowMs) 안에 들어온 개별 요청을 모아 한 번의 배치 호출로 처리
+// - 같은 요청의 여러 위치뿐 아니라 동시에 들어온 다른 요청의 위치도 함께 묶임
+// - batchFn(keys)는 keys와 같은 순서의 결과 배열을 반환하며, Error 항목은 해당 요청만 실패 처리
+
+export function createBatchLoader(batchFn, { windowMs = 5, maxBatchSize = 50 } = {}) {
+  let queue = [];
+  let timer = null;
+
+  async function run(batch) {
+    try {
+      const results = await batchFn(batch.map((entry) => entry.key));
+      batch.forEach((entry, index) => {
+        const result = results[index];
+        if (result instanceof Error) {
+          entry.reject(result);
+        } else {
+          entry.resolve(result);
+        }
+      });
+    } catch (error) {
+      batch.forEach((entry) => entry.reject(error));
+    }
+  }
+
+  function flush() {
+    clearTimeout(timer);
+    timer = null;
+    const pending = queue;
+    queue = [];
+
+    for (let start = 0; start < pending.length; start += maxBatchSize) {
+      run(pending.slice(start, start + maxBatchSize));
+    }
+  }
+
+  function load(key) {
+    return new Promise((resolve, reject) => {
+      queue.push({ key, resolve, reject });
+      if (queue.length >= maxBatchSize) {
+        flush();
+      } else if (!timer) {
+        timer = setTimeout(flush, windowMs);
+      }
+    });
+  }
+
+  return { load };
+}
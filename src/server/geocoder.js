@@ -0,0 +1,217 @@
+import { readFileSync } from "node:fs";
+import { upstreamError } from "./resilience.js";
+
+// 위치 검색(/api/geocode)
+// - 정렬된 배열 기반 접두어 색인: 번들된 주요 도시 목록(data/gazetteer.json) + 한 번 조회된 장소
+// - 색인 결과가 요청 개수보다 적을 때만 Open-Meteo 지오코딩을 호출해 합치고, 그 결과는 LRU로 보관한 뒤 색인에도 추가
+// - 같은 검색어로 진행 중인 외부 호출은 하나로 합침
+
+const GAZETTEER_FILE = new URL("../../data/gazetteer.json", import.meta.url);
+const MAX_PREFIX_SCAN = 500;
+
+export function loadGazetteer(file = GAZETTEER_FILE) {
+  try {
+    const data = JSON.parse(readFileSync(file, "utf8"));
+    return Array.isArray(data) ? data : [];
+  } catch {
+    return [];
+  }
+}
+
+export function normalizePlaceName(value) {
+  return String(value ?? "")
+    .normalize("NFKC")
+    .trim()
+    .toLowerCase()
+    .replace(/\s+/g, " ");
+}
+
+function placeId(place) {
+  return `${normalizePlaceName(place.name)}|${Number(place.latitude).toFixed(2)}|${Number(place.longitude).toFixed(2)}`;
+}
+
+function toPlace(raw) {
+  return {
+    name: raw.name,
+    latitude: raw.latitude,
+    longitude: raw.longitude,
+    country: raw.country ?? null,
+    admin1: raw.admin1 ?? null,
+    population: typeof raw.population === "number" ? raw.population : null,
+  };
+}
+
+export function createPrefixIndex() {
+  // { key, id, place }를 key 기준으로 정렬 보관
+  const rows = [];
+  const places = new Map();
+
+  function lowerBound(key) {
+    let low = 0;
+    let high = rows.length;
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (rows[mid].key < key) low = mid + 1;
+      else high = mid;
+    }
+    return low;
+  }
+
+  function add(raw, aliases = []) {
+    const place = toPlace(raw);
+    const id = placeId(place);
+    if (places.has(id)) return false;
+    places.set(id, place);
+
+    const keys = new Set([raw.name, ...aliases].map(normalizePlaceName).filter(Boolean));
+    for (const key of keys) {
+      rows.splice(lowerBound(key), 0, { key, id, place });
+    }
+    return true;
+  }
+
+  // 접두어가 일치하는 장소를 인구 많은 순으로 반환
+  function search(prefix, limit) {
+    const key = normalizePlaceName(prefix);
+    if (!key) return [];
+
+    const matches = new Map();
+    const start = lowerBound(key);
+    for (let i = start; i < rows.length && i - start < MAX_PREFIX_SCAN; i += 1) {
+      if (!rows[i].key.startsWith(key)) break;
+      const exact = rows[i].key === key;
+      const previous = matches.get(rows[i].id);
+      if (!previous || (exact && !previous.exact)) {
+        matches.set(rows[i].id, { place: rows[i].place, exact });
+      }
+    }
+
+    return Array.from(matches.values())
+      .sort((a, b) => Number(b.exact) - Number(a.exact) || (b.place.population ?? 0) - (a.place.population ?? 0))
+      .slice(0, limit)
+      .map((match) => match.place);
+  }
+
+  return {
+    add,
+    search,
+    get size() {
+      return places.size;
+    },
+  };
+}
+
+async function fetchGeocoding(fetchImpl, { query, count, language }) {
+  const endpoint = new URL("https://geocoding-api.open-meteo.com/v1/search");
+  endpoint.searchParams.set("name", query);
+  endpoint.searchParams.set("count", String(count));
+  endpoint.searchParams.set("language", language);
+
+  const response = await fetchImpl(endpoint);
+  if (!response.ok) {
+    throw upstreamError("위치 검색 API 요청에 실패했습니다.", response);
+  }
+
+  const data = await response.json();
+  return Array.isArray(data?.results) ? data.results.map(toPlace) : [];
+}
+
+export function createGeocoder({
+  fetchImpl = fetch,
+  gazetteer = loadGazetteer(),
+  maxCachedQueries = 500,
+  maxLearnedPlaces = 5_000,
+  callUpstream = (task) => task(),
+} = {}) {
+  const index = createPrefixIndex();
+  for (const entry of gazetteer) {
+    index.add(entry, entry.names);
+  }
+  const gazetteerSize = index.size;
+
+  const upstreamResults = new Map();
+  const inflight = new Map();
+  const counters = { index: 0, cache: 0, upstream: 0 };
+
+  function remember(key, results) {
+    upstreamResults.delete(key);
+    upstreamResults.set(key, results);
+    while (upstreamResults.size > maxCachedQueries) {
+      upstreamResults.delete(upstreamResults.keys().next().value);
+    }
+
+    // 조회된 장소는 이후 접두어 검색에서 바로 찾도록 색인에 추가 (상한까지만)
+    for (const place of results) {
+      if (index.size - gazetteerSize >= maxLearnedPlaces) break;
+      index.add(place);
+    }
+  }
+
+  function fetchUpstream(key, query, count, language) {
+    if (!inflight.has(key)) {
+      counters.upstream += 1;
+      const pending = callUpstream(() => fetchGeocoding(fetchImpl, { query, count, language }))
+        .then((results) => {
+          remember(key, results);
+          return results;
+        })
+        .finally(() => inflight.delete(key));
+      inflight.set(key, pending);
+    }
+    return inflight.get(key);
+  }
+
+  async function search(query, { count = 5, language = "en" } = {}) {
+    const normalized = normalizePlaceName(query);
+    if (!normalized) {
+      return { results: [], source: "index" };
+    }
+
+    // 색인만으로 count개를 채우면 외부 호출 없이 응답
+    const indexed = index.search(normalized, count);
+    if (indexed.length >= count) {
+      counters.index += 1;
+      return { results: indexed, source: "index" };
+    }
+
+    // 모자라면 같은 이름의 다른 장소가 있을 수 있으므로 외부 결과(캐시/진행 중인 호출 공유)와 합침
+    const key = `${normalized}|${count}|${language}`;
+    let upstream;
+    let source;
+    if (upstreamResults.has(key)) {
+      upstream = upstreamResults.get(key);
+      upstreamResults.delete(key);
+      upstreamResults.set(key, upstream);
+      counters.cache += 1;
+      source = "cache";
+    } else {
+      try {
+        upstream = await fetchUpstream(key, query.trim(), count, language);
+        source = "upstream";
+      } catch (error) {
+        // 외부 호출이 실패해도 색인 결과가 있으면 그것으로 응답
+        // 채우지 못한 임시 결과이므로 degraded로 표시해 오래 캐시되지 않게 함
+        if (indexed.length === 0) throw error;
+        counters.index += 1;
+        return { results: indexed, source: "index", degraded: true };
+      }
+    }
+
+    const seen = new Set(indexed.map(placeId));
+    const merged = [...indexed];
+    for (const place of upstream) {
+      if (merged.length >= count) break;
+      const id = placeId(place);
+      if (seen.has(id)) continue;
+      seen.add(id);
+      merged.push(place);
+    }
+    return { results: merged, source };
+  }
+
+  function stats() {
+    return { ...counters, places: index.size, cachedQueries: upstreamResults.size };
+  }
+
+  return { search, stats };
+}
@@ -0,0 +1,263 @@
+// 서버 내부 계측
+// - HDR 방식(2의 거듭제곱 구간을 8개로 나눈 로그-선형 버킷) 지연 히스토그램과 카운터
+// - 요청 단위 단계별 시간 -> Server-Timing 헤더
+// - Prometheus 텍스트 형식 출력(/api/metrics)
+// sampleRate가 0이면 시간 측정(performance.now) 자체를 하지 않고 카운터만 증가
+
+const SUB_BUCKETS = 8;
+const SUB_BUCKET_BITS = 3;
+const MAX_EXPONENT = 26; // 2^26 µs ≈ 67초
+const BUCKET_COUNT = SUB_BUCKETS + (MAX_EXPONENT - SUB_BUCKET_BITS + 1) * SUB_BUCKETS;
+
+// Prometheus 출력용 누적 버킷 경계(초)
+export const EXPORT_BOUNDS_SECONDS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+export const EXPORT_QUANTILES = [0.5, 0.9, 0.99];
+
+function bucketIndex(micros) {
+  if (micros < SUB_BUCKETS) {
+    return micros;
+  }
+  const exponent = Math.min(31 - Math.clz32(micros), MAX_EXPONENT);
+  if (exponent === MAX_EXPONENT && micros >= 2 ** (MAX_EXPONENT + 1)) {
+    return BUCKET_COUNT - 1;
+  }
+  const sub = (micros >>> (exponent - SUB_BUCKET_BITS)) & (SUB_BUCKETS - 1);
+  return SUB_BUCKETS + (exponent - SUB_BUCKET_BITS) * SUB_BUCKETS + sub;
+}
+
+function bucketUpperMicros(index) {
+  if (index < SUB_BUCKETS) {
+    return index + 1;
+  }
+  const exponent = SUB_BUCKET_BITS + Math.floor((index - SUB_BUCKETS) / SUB_BUCKETS);
+  const sub = (index - SUB_BUCKETS) % SUB_BUCKETS;
+  return (SUB_BUCKETS + sub + 1) * 2 ** (exponent - SUB_BUCKET_BITS);
+}
+
+export function createLatencyHistogram() {
+  const counts = new Uint32Array(BUCKET_COUNT);
+  let count = 0;
+  let sumMs = 0;
+
+  function record(ms) {
+    const micros = Math.max(0, Math.round(ms * 1000));
+    counts[bucketIndex(micros)] += 1;
+    count += 1;
+    sumMs += ms;
+  }
+
+  // 버킷 상한값을 반환하므로 상대 오차는 최대 1/8 수준
+  function quantile(q) {
+    if (count === 0) return null;
+    const rank = Math.ceil(q * count);
+    let seen = 0;
+    for (let index = 0; index < BUCKET_COUNT; index += 1) {
+      seen += counts[index];
+      if (seen >= rank) return bucketUpperMicros(index) / 1000;
+    }
+    return bucketUpperMicros(BUCKET_COUNT - 1) / 1000;
+  }
+
+  function countAtOrBelow(ms) {
+    const limit = ms * 1000;
+    let total = 0;
+    for (let index = 0; index < BUCKET_COUNT && bucketUpperMicros(index) <= limit; index += 1) {
+      total += counts[index];
+    }
+    return total;
+  }
+
+  return {
+    record,
+    quantile,
+    countAtOrBelow,
+    get count() {
+      return count;
+    },
+    get sumMs() {
+      return sumMs;
+    },
+  };
+}
+
+function labelKey(labels) {
+  return Object.keys(labels)
+    .sort()
+    .map((key) => `${key}=${labels[key]}`)
+    .join(",");
+}
+
+function formatLabels(labels, extra = {}) {
+  const entries = Object.entries({ ...labels, ...extra });
+  if (entries.length === 0) return "";
+  const body = entries
+    .map(([key, value]) => `${key}="${String(value).replace(/\\/g, "\\\\").replace(/"/g, '\\"').replace(/\n/g, "\\n")}"`)
+    .join(",");
+  return `{${body}}`;
+}
+
+const NOOP_TIMER = {
+  sampled: false,
+  time: (_name, promise) => promise,
+  measure: (_name, fn) => fn(),
+  header: () => null,
+  finish: () => {},
+};
+
+export function createMetrics({ sampleRate = 1, random = Math.random, now = () => performance.now() } = {}) {
+  const families = new Map();
+  const collectors = [];
+
+  function family(name, type, help) {
+    let entry = families.get(name);
+    if (!entry) {
+      entry = { name, type, help, series: new Map() };
+      families.set(name, entry);
+    }
+    return entry;
+  }
+
+  function seriesFor(name, type, help, labels, create) {
+    const entry = family(name, type, help);
+    const key = labelKey(labels);
+    let series = entry.series.get(key);
+    if (!series) {
+      series = { labels, ...create() };
+      entry.series.set(key, series);
+    }
+    return series;
+  }
+
+  function increment(name, help, labels = {}, by = 1) {
+    seriesFor(name, "counter", help, labels, () => ({ value: 0 })).value += by;
+  }
+
+  function observe(name, help, labels, ms) {
+    seriesFor(name, "histogram", help, labels, () => ({ histogram: createLatencyHistogram() })).histogram.record(ms);
+  }
+
+  function shouldSample() {
+    return sampleRate >= 1 || (sampleRate > 0 && random() < sampleRate);
+  }
+
+  // 외부 API 호출별 지연/결과 집계 (샘플링하지 않은 호출은 결과 카운터만 증가)
+  function instrumentFetch(fetchImpl) {
+    return async (url, options) => {
+      const host = (typeof url === "string" ? new URL(url) : url).hostname;
+      const startedAt = shouldSample() ? now() : null;
+      let outcome = "error";
+      try {
+        const response = await fetchImpl(url, options);
+        outcome = response.ok ? "ok" : `http_${response.status}`;
+        return response;
+      } catch (error) {
+        outcome = error?.name === "TimeoutError" ? "timeout" : error?.name === "AbortError" ? "cancelled" : "error";
+        throw error;
+      } finally {
+        increment("weather_upstream_requests_total", "외부 API 호출 수", { host, outcome });
+        if (startedAt !== null) {
+          observe("weather_upstream_duration_seconds", "외부 API 응답 시간", { host }, now() - startedAt);
+        }
+      }
+    };
+  }
+
+  // 요청 단위 단계 시간. 여러 위치가 동시에 진행되므로 단계별로 가장 오래 걸린 값(임계 경로)을 기록
+  function startRequest(route) {
+    if (!shouldSample()) {
+      return NOOP_TIMER;
+    }
+
+    const startedAt = now();
+    const phases = new Map();
+    const note = (name, ms) => {
+      phases.set(name, Math.max(phases.get(name) ?? 0, ms));
+    };
+
+    return {
+      sampled: true,
+      time(name, promise) {
+        const begin = now();
+        return promise.finally(() => note(name, now() - begin));
+      },
+      measure(name, fn) {
+        const begin = now();
+        try {
+          return fn();
+        } finally {
+          note(name, now() - begin);
+        }
+      },
+      header() {
+        const entries = Array.from(phases.entries()).map(([name, ms]) => `${name};dur=${ms.toFixed(2)}`);
+        entries.push(`total;dur=${(now() - startedAt).toFixed(2)}`);
+        return entries.join(", ");
+      },
+      finish() {
+        for (const [phase, ms] of phases) {
+          observe("weather_phase_duration_seconds", "추천 요청 단계별 시간", { route, phase }, ms);
+        }
+        observe("weather_http_request_duration_seconds", "API 요청 처리 시간", { route }, now() - startedAt);
+      },
+    };
+  }
+
+  // 캐시/회로 차단기처럼 상태를 따로 가진 모듈의 값을 출력 시점에 수집
+  function addCollector(collect) {
+    collectors.push(collect);
+  }
+
+  function renderHistogram(lines, name, series) {
+    const { histogram, labels } = series;
+    for (const bound of EXPORT_BOUNDS_SECONDS) {
+      lines.push(`${name}_bucket${formatLabels(labels, { le: bound })} ${histogram.countAtOrBelow(bound * 1000)}`);
+    }
+    lines.push(`${name}_bucket${formatLabels(labels, { le: "+Inf" })} ${histogram.count}`);
+    lines.push(`${name}_sum${formatLabels(labels)} ${histogram.sumMs / 1000}`);
+    lines.push(`${name}_count${formatLabels(labels)} ${histogram.count}`);
+  }
+
+  function render() {
+    const lines = [];
+    const output = new Map(families);
+
+    for (const collect of collectors) {
+      for (const sample of collect()) {
+        const entry = output.get(sample.name) ?? { name: sample.name, type: sample.type, help: sample.help, series: new Map() };
+        entry.series.set(labelKey(sample.labels ?? {}), { labels: sample.labels ?? {}, value: sample.value });
+        output.set(sample.name, entry);
+      }
+    }
+
+    for (const entry of output.values()) {
+      lines.push(`# HELP ${entry.name} ${entry.help}`);
+      lines.push(`# TYPE ${entry.name} ${entry.type}`);
+      for (const series of entry.series.values()) {
+        if (entry.type === "histogram") {
+          renderHistogram(lines, entry.name, series);
+        } else {
+          lines.push(`${entry.name}${formatLabels(series.labels)} ${series.value}`);
+        }
+      }
+    }
+
+    // HDR 히스토그램 분위수는 별도 게이지로 노출
+    const quantileName = "weather_latency_quantile_seconds";
+    lines.push(`# HELP ${quantileName} 지연 히스토그램 분위수(HDR 버킷 기준)`);
+    lines.push(`# TYPE ${quantileName} gauge`);
+    for (const entry of families.values()) {
+      if (entry.type !== "histogram") continue;
+      for (const series of entry.series.values()) {
+        for (const q of EXPORT_QUANTILES) {
+          const value = series.histogram.quantile(q);
+          if (value == null) continue;
+          lines.push(`${quantileName}${formatLabels(series.labels, { metric: entry.name, quantile: q })} ${value / 1000}`);
+        }
+      }
+    }
+
+    return `${lines.join("\n")}\n`;
+  }
+
+  return { increment, observe, instrumentFetch, startRequest, addCollector, render, shouldSample };
+}
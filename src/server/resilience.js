@@ -0,0 +1,188 @@
+// 외부 API 지연/장애가 추천 응답 전체를 막지 않도록 하는 도구 모음
+// - withFetchTimeout: 모든 외부 호출에 타임아웃 부여
+// - withDeadline: 요청 단위 시간 예산 안에서만 기다리고 초과 시 대체 값 사용
+// - firstAvailable: 대체 소스를 실패 후가 아니라 일정 지연 뒤 미리 시작(hedging), 진 요청은 취소
+// - createCircuitBreaker: 연속 실패한 호스트는 잠시 건너뛰고 바로 다음 대체 경로로 이동
+// - upstreamError: 외부 API 오류에 HTTP 상태를 붙여 회로 차단기가 요청 쪽 문제(4xx)를 구분하게 함
+
+export function withFetchTimeout(fetchImpl, timeoutMs) {
+  return (url, options = {}) => {
+    const timeout = AbortSignal.timeout(timeoutMs);
+    const signal = options.signal ? AbortSignal.any([options.signal, timeout]) : timeout;
+    return fetchImpl(url, { ...options, signal });
+  };
+}
+
+export function upstreamError(message, response) {
+  const error = new Error(message);
+  error.status = response?.status;
+  return error;
+}
+
+// 429를 뺀 4xx는 호스트 장애가 아니라 요청(잘못된 입력 등) 문제
+function isClientError(error) {
+  const status = error?.status;
+  return Number.isInteger(status) && status >= 400 && status < 500 && status !== 429;
+}
+
+export function withDeadline(promise, ms, onTimeout) {
+  let timer = null;
+  const timeout = new Promise((resolve, reject) => {
+    timer = setTimeout(() => {
+      try {
+        resolve(onTimeout());
+      } catch (error) {
+        reject(error);
+      }
+    }, Math.max(0, ms));
+  });
+
+  return Promise.race([promise, timeout]).finally(() => clearTimeout(timer));
+}
+
+// tasks를 순서대로 시작하되, 앞 작업이 hedgeDelayMs 안에 끝나지 않으면 다음 작업도 함께 시작
+// 앞 작업이 null/실패로 끝나면 지연 없이 바로 다음 작업을 시작하고, 처음 얻은 값으로 응답
+// - 각 작업은 AbortSignal을 받으며, 응답이 정해지면 진 작업(아직 진행 중인 작업)만 취소
+// - acquireHedge가 null을 반환하면(동시 hedge 상한) 미리 시작하지 않고 앞 작업이 실패할 때까지 기다림
+export function firstAvailable(tasks, { hedgeDelayMs = 400, acquireHedge = () => () => {} } = {}) {
+  return new Promise((resolve) => {
+    let started = 0;
+    let finished = 0;
+    let done = false;
+    let timer = null;
+    const controllers = [];
+
+    // 이긴 작업의 signal은 취소하지 않음 (그 signal로 시작한 후속 작업이 있을 수 있음)
+    const finish = (value, winner = null) => {
+      done = true;
+      clearTimeout(timer);
+      for (const controller of controllers) {
+        if (controller !== winner) controller.abort();
+      }
+      resolve(value);
+    };
+
+    const launch = (hedged = false) => {
+      clearTimeout(timer);
+      timer = null;
+      if (done || started >= tasks.length) return;
+
+      let release = () => {};
+      if (hedged) {
+        const releaseSlot = acquireHedge();
+        if (!releaseSlot) return;
+        // 취소되면 작업이 끝나기를 기다리지 않고 바로 상한 자리를 돌려줌
+        let released = false;
+        release = () => {
+          if (released) return;
+          released = true;
+          releaseSlot();
+        };
+      }
+
+      const task = tasks[started];
+      const controller = new AbortController();
+      controller.signal.addEventListener("abort", release);
+      controllers.push(controller);
+      started += 1;
+      if (started < tasks.length) {
+        timer = setTimeout(() => launch(true), hedgeDelayMs);
+      }
+
+      Promise.resolve()
+        .then(() => task(controller.signal))
+        .catch(() => null)
+        .then((value) => {
+          release();
+          finished += 1;
+          if (done) return;
+          if (value != null) {
+            finish(value, controller);
+          } else if (started < tasks.length) {
+            launch();
+          } else if (finished === started) {
+            finish(null);
+          }
+        });
+    };
+
+    if (tasks.length === 0) {
+      resolve(null);
+      return;
+    }
+    launch();
+  });
+}
+
+export function createCircuitBreaker({ failureThreshold = 5, cooldownMs = 30_000, now = Date.now } = {}) {
+  const circuits = new Map();
+
+  function circuitFor(key) {
+    let circuit = circuits.get(key);
+    if (!circuit) {
+      circuit = { failures: 0, openUntil: 0, probing: false, skipped: 0 };
+      circuits.set(key, circuit);
+    }
+    return circuit;
+  }
+
+  function onFailure(circuit) {
+    circuit.failures += 1;
+    if (circuit.probing || circuit.failures >= failureThreshold) {
+      circuit.openUntil = now() + cooldownMs;
+    }
+    circuit.probing = false;
+  }
+
+  // task가 예외를 던지면 실패로 집계 (호출한 쪽이 취소한 AbortError와 429를 뺀 4xx 응답은 제외)
+  // null은 "데이터 없음"이라는 정상 응답이므로, emptyIsFailure를 준 호출만 실패로 집계
+  async function call(key, task, { emptyIsFailure = false } = {}) {
+    const circuit = circuitFor(key);
+
+    if (circuit.openUntil > 0) {
+      // 차단 중이거나, 쿨다운이 지났어도 이미 시험 요청이 진행 중이면 건너뜀
+      if (now() < circuit.openUntil || circuit.probing) {
+        circuit.skipped += 1;
+        throw new Error(`외부 API(${key}) 연결이 일시적으로 중단되었습니다.`);
+      }
+      circuit.probing = true;
+    }
+
+    let value;
+    try {
+      value = await task();
+    } catch (error) {
+      if (error?.name === "AbortError" || isClientError(error)) {
+        circuit.probing = false;
+      } else {
+        onFailure(circuit);
+      }
+      throw error;
+    }
+
+    if (value == null && emptyIsFailure) {
+      onFailure(circuit);
+    } else {
+      circuit.failures = 0;
+      circuit.openUntil = 0;
+      circuit.probing = false;
+    }
+    return value;
+  }
+
+  function stats() {
+    const current = now();
+    return Object.fromEntries(
+      Array.from(circuits.entries()).map(([key, circuit]) => [
+        key,
+        {
+          state: circuit.openUntil === 0 ? "closed" : current < circuit.openUntil ? "open" : "half-open",
+          failures: circuit.failures,
+          skipped: circuit.skipped,
+        },
+      ]),
+    );
+  }
+
+  return { call, stats };
+}
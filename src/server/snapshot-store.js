@@ -0,0 +1,43 @@
+// 모든 서버리스 인스턴스가 함께 읽는 스냅샷 저장소
+// - Vercel KV(Upstash Redis)의 REST API를 fetch로 직접 호출 (추가 의존성 없음)
+// - 바이너리 스냅샷은 base64 문자열 하나로 저장하고, 유효 시간이 지나면 저장소에서도 만료
+
+export const SNAPSHOT_STORE_KEY = "weather:snapshot:v1";
+
+export function createSnapshotStore({ url, token, key = SNAPSHOT_STORE_KEY, fetchImpl = fetch, timeoutMs = 1_000 }) {
+  async function command(args) {
+    const response = await fetchImpl(url, {
+      method: "POST",
+      headers: { Authorization: `Bearer ${token}`, "Content-Type": "application/json" },
+      body: JSON.stringify(args),
+      signal: AbortSignal.timeout(timeoutMs),
+    });
+    if (!response.ok) {
+      throw new Error("스냅샷 저장소 요청에 실패했습니다.");
+    }
+    const data = await response.json();
+    if (data?.error) {
+      throw new Error(`스냅샷 저장소 오류: ${data.error}`);
+    }
+    return data?.result ?? null;
+  }
+
+  return {
+    async load() {
+      const encoded = await command(["GET", key]);
+      return typeof encoded === "string" ? Buffer.from(encoded, "base64") : null;
+    },
+    async save(buffer, { ttlMs } = {}) {
+      const args = ["SET", key, buffer.toString("base64")];
+      if (ttlMs > 0) args.push("PX", String(ttlMs));
+      await command(args);
+    },
+  };
+}
+
+// KV_REST_API_URL/KV_REST_API_TOKEN(Vercel KV) 또는 UPSTASH_REDIS_REST_URL/TOKEN이 있을 때만 사용
+export function createSnapshotStoreFromEnv(env = process.env, options = {}) {
+  const url = env.KV_REST_API_URL || env.UPSTASH_REDIS_REST_URL;
+  const token = env.KV_REST_API_TOKEN || env.UPSTASH_REDIS_REST_TOKEN;
+  return url && token ? createSnapshotStore({ url, token, ...options }) : null;
+}
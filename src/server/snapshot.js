@@ -0,0 +1,296 @@
+import { readFileSync } from "node:fs";
+
+// 인기 위치의 날씨/대기질 사전 계산 스냅샷 (서버리스 콜드 스타트용)
+//
+// 파일 구조 (little endian)
+//   헤더 32바이트: magic "WOSN" | u16 version | u16 hourlyLength | u32 count | u32 recordSize
+//                  | f64 createdAt(ms) | u32 maxAgeMs | u32 reserved
+//   좌표 색인: count x (i32 latKey, i32 lonKey) — 소수점 둘째 자리 반올림 좌표, 정렬되어 있어 이진 탐색
+//   레코드: count x recordSize (색인과 같은 순서, 고정 길이)
+//     0   f32 latitude, f32 longitude
+//     8   f32 x 9 현재: tempC, humidity, uvIndex, precipitationMm, precipitationProbability,
+//                       temperatureRange, pm25, pm10, airQualityIndex
+//     44  f32 x 5 내일: tempMax, tempMin, precipitationProbability, uvIndex, precipitationMm
+//     64  ascii[16] updatedAt, ascii[16] 시간별 예보 시작 시각, ascii[32] timezone
+//     128 f32 x hourlyLength x 5 시간별 열: tempC, humidity, uvIndex, precipitationMm, precipitationProbability
+// 값이 없으면 NaN으로 저장. 추천(recommendOutfit/타임라인)은 이 입력값으로 요청 시 계산(µs 단위)
+
+export const DEFAULT_SNAPSHOT_FILE = new URL("../../data/snapshot.bin", import.meta.url);
+const MAGIC = "WOSN";
+export const SNAPSHOT_VERSION = 1;
+const HEADER_SIZE = 32;
+const INDEX_ENTRY_SIZE = 8;
+const FIXED_RECORD_SIZE = 128;
+const HOURLY_COLUMNS = ["tempC", "humidity", "uvIndex", "precipitationMm", "precipitationProbability"];
+const CURRENT_FIELDS = [
+  "tempC",
+  "humidity",
+  "uvIndex",
+  "precipitationMm",
+  "precipitationProbability",
+  "temperatureRange",
+  "pm25",
+  "pm10",
+  "airQualityIndex",
+];
+const TOMORROW_FIELDS = ["tempMax", "tempMin", "precipitationProbability", "uvIndex", "precipitationMm"];
+
+export function coordinateKey({ latitude, longitude }) {
+  return [Math.round(Number(latitude) * 100), Math.round(Number(longitude) * 100)];
+}
+
+function compareKeys(aLat, aLon, bLat, bLon) {
+  return aLat - bLat || aLon - bLon;
+}
+
+function writeFloat(view, offset, value) {
+  view.setFloat32(offset, typeof value === "number" ? value : Number.NaN, true);
+}
+
+function readFloat(view, offset) {
+  const value = view.getFloat32(offset, true);
+  return Number.isNaN(value) ? null : Number(value.toFixed(2));
+}
+
+function writeAscii(buffer, offset, length, value) {
+  buffer.write(String(value ?? "").slice(0, length).padEnd(length, "\0"), offset, length, "latin1");
+}
+
+function readAscii(buffer, offset, length) {
+  return buffer.toString("latin1", offset, offset + length).replace(/\0+$/, "");
+}
+
+// entries: [{ latitude, longitude, weather(parseCurrentWeather 결과), airQuality }]
+export function encodeSnapshot(entries, { createdAt = Date.now(), maxAgeMs = 45 * 60_000, hourlyLength = 48 } = {}) {
+  const recordSize = FIXED_RECORD_SIZE + hourlyLength * HOURLY_COLUMNS.length * 4;
+
+  const unique = new Map();
+  for (const entry of entries) {
+    const [latKey, lonKey] = coordinateKey(entry);
+    const id = `${latKey},${lonKey}`;
+    if (!unique.has(id)) unique.set(id, { latKey, lonKey, entry });
+  }
+  const sorted = Array.from(unique.values()).sort((a, b) => compareKeys(a.latKey, a.lonKey, b.latKey, b.lonKey));
+
+  const indexOffset = HEADER_SIZE;
+  const recordsOffset = indexOffset + sorted.length * INDEX_ENTRY_SIZE;
+  const buffer = Buffer.alloc(recordsOffset + sorted.length * recordSize);
+  const view = new DataView(buffer.buffer, buffer.byteOffset, buffer.byteLength);
+
+  buffer.write(MAGIC, 0, "latin1");
+  view.setUint16(4, SNAPSHOT_VERSION, true);
+  view.setUint16(6, hourlyLength, true);
+  view.setUint32(8, sorted.length, true);
+  view.setUint32(12, recordSize, true);
+  view.setFloat64(16, createdAt, true);
+  view.setUint32(24, maxAgeMs, true);
+
+  sorted.forEach(({ latKey, lonKey, entry }, i) => {
+    view.setInt32(indexOffset + i * INDEX_ENTRY_SIZE, latKey, true);
+    view.setInt32(indexOffset + i * INDEX_ENTRY_SIZE + 4, lonKey, true);
+
+    const base = recordsOffset + i * recordSize;
+    const { weather, airQuality } = entry;
+    const current = { ...weather, ...(airQuality ?? {}) };
+
+    writeFloat(view, base, entry.latitude);
+    writeFloat(view, base + 4, entry.longitude);
+    CURRENT_FIELDS.forEach((field, j) => writeFloat(view, base + 8 + j * 4, current[field]));
+    TOMORROW_FIELDS.forEach((field, j) => writeFloat(view, base + 44 + j * 4, weather.tomorrow?.[field]));
+    writeAscii(buffer, base + 64, 16, weather.updatedAt);
+    writeAscii(buffer, base + 80, 16, weather.hourly?.time?.[0]);
+    writeAscii(buffer, base + 96, 32, weather.timezone);
+
+    HOURLY_COLUMNS.forEach((column, c) => {
+      const values = weather.hourly?.[column];
+      for (let h = 0; h < hourlyLength; h += 1) {
+        writeFloat(view, base + FIXED_RECORD_SIZE + (c * hourlyLength + h) * 4, values?.[h]);
+      }
+    });
+  });
+
+  return buffer;
+}
+
+// 시간별 예보는 1시간 간격이므로 시작 시각만 저장하고 나머지는 계산
+function hourlyTimes(start, length) {
+  const startTs = Date.parse(`${start}Z`);
+  if (Number.isNaN(startTs)) {
+    return null;
+  }
+  // 날짜 문자열은 자정을 넘을 때만 새로 만든다 (toISOString은 시간마다 호출하기엔 느림)
+  const times = new Array(length);
+  let day = null;
+  for (let h = 0; h < length; h += 1) {
+    const hourTs = startTs + h * 3_600_000;
+    const hourOfDay = Math.floor(hourTs / 3_600_000) % 24;
+    if (day === null || hourOfDay === 0) {
+      day = new Date(hourTs).toISOString().slice(0, 11);
+    }
+    times[h] = `${day}${String(hourOfDay).padStart(2, "0")}:00`;
+  }
+  return times;
+}
+
+export function openSnapshot(buffer) {
+  if (buffer.length < HEADER_SIZE || buffer.toString("latin1", 0, 4) !== MAGIC) {
+    throw new Error("스냅샷 파일 형식이 올바르지 않습니다.");
+  }
+
+  const view = new DataView(buffer.buffer, buffer.byteOffset, buffer.byteLength);
+  const version = view.getUint16(4, true);
+  if (version !== SNAPSHOT_VERSION) {
+    throw new Error(`지원하지 않는 스냅샷 버전입니다: ${version}`);
+  }
+
+  const hourlyLength = view.getUint16(6, true);
+  const count = view.getUint32(8, true);
+  const recordSize = view.getUint32(12, true);
+  const createdAt = view.getFloat64(16, true);
+  const maxAgeMs = view.getUint32(24, true);
+  const indexOffset = HEADER_SIZE;
+  const recordsOffset = indexOffset + count * INDEX_ENTRY_SIZE;
+
+  if (buffer.length < recordsOffset + count * recordSize) {
+    throw new Error("스냅샷 파일이 손상되었습니다.");
+  }
+
+  function findRecord(location) {
+    const [latKey, lonKey] = coordinateKey(location);
+    let low = 0;
+    let high = count - 1;
+    while (low <= high) {
+      const mid = (low + high) >>> 1;
+      const offset = indexOffset + mid * INDEX_ENTRY_SIZE;
+      const order = compareKeys(view.getInt32(offset, true), view.getInt32(offset + 4, true), latKey, lonKey);
+      if (order === 0) return mid;
+      if (order < 0) low = mid + 1;
+      else high = mid - 1;
+    }
+    return -1;
+  }
+
+  // parseCurrentWeather와 같은 형태의 weather 객체와 대기질 값으로 복원
+  function decodeRecord(index) {
+    const base = recordsOffset + index * recordSize;
+    const current = Object.fromEntries(CURRENT_FIELDS.map((field, j) => [field, readFloat(view, base + 8 + j * 4)]));
+    const tomorrow = Object.fromEntries(TOMORROW_FIELDS.map((field, j) => [field, readFloat(view, base + 44 + j * 4)]));
+    const hourlyStart = readAscii(buffer, base + 80, 16);
+
+    const time = hourlyTimes(hourlyStart, hourlyLength);
+    let hourly = null;
+    if (time) {
+      hourly = { time };
+      HOURLY_COLUMNS.forEach((column, c) => {
+        const values = new Float64Array(hourlyLength);
+        for (let h = 0; h < hourlyLength; h += 1) {
+          values[h] = view.getFloat32(base + FIXED_RECORD_SIZE + (c * hourlyLength + h) * 4, true);
+        }
+        hourly[column] = values;
+      });
+    }
+
+    const airQuality =
+      current.pm25 == null && current.pm10 == null && current.airQualityIndex == null
+        ? null
+        : { pm25: current.pm25, pm10: current.pm10, airQualityIndex: current.airQualityIndex };
+
+    return {
+      weather: {
+        tempC: current.tempC,
+        humidity: current.humidity,
+        uvIndex: current.uvIndex,
+        precipitationMm: current.precipitationMm,
+        precipitationProbability: current.precipitationProbability ?? 0,
+        temperatureRange: current.temperatureRange,
+        pm25: null,
+        pm10: null,
+        airQualityIndex: null,
+        updatedAt: readAscii(buffer, base + 64, 16) || new Date(createdAt).toISOString(),
+        timezone: readAscii(buffer, base + 96, 32) || null,
+        hourly,
+        tomorrow: {
+          ...tomorrow,
+          tempAvg:
+            tomorrow.tempMax != null && tomorrow.tempMin != null
+              ? Number(((tomorrow.tempMax + tomorrow.tempMin) / 2).toFixed(1))
+              : null,
+          temperatureRange:
+            tomorrow.tempMax != null && tomorrow.tempMin != null
+              ? Number((tomorrow.tempMax - tomorrow.tempMin).toFixed(1))
+              : null,
+        },
+      },
+      airQuality,
+    };
+  }
+
+  return {
+    version,
+    count,
+    createdAt,
+    maxAgeMs,
+    isFresh(now = Date.now()) {
+      return now - createdAt < maxAgeMs;
+    },
+    lookup(location) {
+      const index = findRecord(location);
+      return index === -1 ? null : decodeRecord(index);
+    },
+  };
+}
+
+// 파일 전체를 한 번에 읽고(레코드는 조회 시점에 필요한 것만 해석) 없거나 형식이 다르면 스냅샷 없이 동작
+export function loadSnapshotFile(file) {
+  try {
+    return openSnapshot(readFileSync(file));
+  } catch {
+    return null;
+  }
+}
+
+// 인구 상위 N개 도시(번들 도시 목록) 또는 위경도 격자로 사전 계산 대상 위치 선택
+export function selectSnapshotLocations({ gazetteer = [], top = 0, grid = null } = {}) {
+  const locations = [...gazetteer]
+    .sort((a, b) => (b.population ?? 0) - (a.population ?? 0))
+    .slice(0, top)
+    .map(({ name, latitude, longitude }) => ({ name, latitude, longitude }));
+
+  if (grid) {
+    const { latMin, latMax, lonMin, lonMax, step } = grid;
+    for (let latitude = latMin; latitude <= latMax + 1e-9; latitude += step) {
+      for (let longitude = lonMin; longitude <= lonMax + 1e-9; longitude += step) {
+        locations.push({ latitude: Number(latitude.toFixed(2)), longitude: Number(longitude.toFixed(2)) });
+      }
+    }
+  }
+
+  return locations;
+}
+
+// fetchWeatherBatch/fetchAirQualityBatch는 app-server의 배치 조회 함수 (위치 배열 -> 같은 순서의 결과 배열)
+export async function buildSnapshot({ locations, fetchWeatherBatch, fetchAirQualityBatch, chunkSize = 50, ...options }) {
+  const entries = [];
+
+  for (let start = 0; start < locations.length; start += chunkSize) {
+    const chunk = locations.slice(start, start + chunkSize);
+    // 한 묶음이 실패해도 나머지 위치는 계속 채운다
+    const [weatherResults, airQualityResults] = await Promise.all([
+      fetchWeatherBatch(chunk).catch(() => []),
+      fetchAirQualityBatch(chunk).catch(() => []),
+    ]);
+
+    chunk.forEach((location, i) => {
+      const weather = weatherResults[i];
+      if (!weather || weather instanceof Error) return;
+      entries.push({
+        latitude: location.latitude,
+        longitude: location.longitude,
+        weather,
+        airQuality: airQualityResults[i] ?? null,
+      });
+    });
+  }
+
+  return { buffer: encodeSnapshot(entries, options), count: entries.length };
+}
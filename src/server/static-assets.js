@@ -0,0 +1,309 @@
+import { createReadStream, promises as fs } from "node:fs";
+import crypto from "node:crypto";
+import path from "node:path";
+import zlib from "node:zlib";
+
+// 로컬/Node 서버용 정적 파일 서빙
+// - 파일 버퍼를 메모리 LRU에 보관하고 mtime이 바뀌면 다시 읽음 (stat은 revalidateMs마다 한 번)
+// - 내용 해시 기반 강한 ETag + If-None-Match 304 응답
+// - 텍스트 자산은 gzip/brotli 압축본을 미리 만들어 둠
+// - 큰 파일은 버퍼링하지 않고 스트리밍하며 Range 요청 지원
+// - 내용 해시가 들어간 URL(hot.1a2b3c4d.png)은 Cache-Control: immutable로 응답
+
+export const STATIC_TYPES = {
+  ".html": "text/html; charset=utf-8",
+  ".css": "text/css; charset=utf-8",
+  ".js": "application/javascript; charset=utf-8",
+  ".svg": "image/svg+xml",
+  ".json": "application/json; charset=utf-8",
+  ".png": "image/png",
+  ".jpg": "image/jpeg",
+  ".jpeg": "image/jpeg",
+  ".webp": "image/webp",
+  ".ico": "image/x-icon",
+};
+
+const COMPRESSIBLE_TYPES = new Set([".html", ".css", ".js", ".svg", ".json"]);
+const HASHED_NAME = /^(.+)\.([0-9a-f]{8})(\.[a-z0-9]+)$/i;
+const IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable";
+
+function sendText(res, code, payload, headers = {}) {
+  res.writeHead(code, { "Content-Type": "text/plain; charset=utf-8", ...headers });
+  res.end(payload);
+}
+
+function selectEncoding(entry, acceptEncoding = "") {
+  if (entry.br && /\bbr\b/.test(acceptEncoding)) return "br";
+  if (entry.gzip && /\bgzip\b/.test(acceptEncoding)) return "gzip";
+  return null;
+}
+
+// 단일 구간(bytes=start-end, bytes=start-, bytes=-suffix)만 지원하며, 해석할 수 없으면 전체 응답
+export function parseRange(header, size) {
+  const match = /^bytes=(\d*)-(\d*)$/.exec(header || "");
+  if (!match || (match[1] === "" && match[2] === "")) {
+    return null;
+  }
+
+  let start;
+  let end;
+  if (match[1] === "") {
+    start = Math.max(0, size - Number(match[2]));
+    end = size - 1;
+  } else {
+    start = Number(match[1]);
+    end = match[2] === "" ? size - 1 : Math.min(Number(match[2]), size - 1);
+  }
+
+  if (start > end || start >= size) {
+    return { unsatisfiable: true };
+  }
+  return { start, end };
+}
+
+export function createStaticAssets({
+  root,
+  maxCacheBytes = 16_000_000,
+  maxBufferedFileBytes = 1_000_000,
+  revalidateMs = 1_000,
+  now = Date.now,
+} = {}) {
+  const rootDir = path.resolve(root);
+  const entries = new Map();
+  // "assets/clothes/hot.png" -> "1a2b3c4d" (내용 해시 URL 생성용)
+  const contentHashes = new Map();
+  let totalBytes = 0;
+
+  function entryBytes(entry) {
+    return (entry.body?.length ?? 0) + (entry.gzip?.length ?? 0) + (entry.br?.length ?? 0);
+  }
+
+  function remove(fullPath) {
+    const entry = entries.get(fullPath);
+    if (!entry) return;
+    entries.delete(fullPath);
+    totalBytes -= entryBytes(entry);
+  }
+
+  function store(entry) {
+    remove(entry.fullPath);
+    entries.set(entry.fullPath, entry);
+    totalBytes += entryBytes(entry);
+
+    while (totalBytes > maxCacheBytes && entries.size > 1) {
+      remove(entries.keys().next().value);
+    }
+  }
+
+  function resolveTarget(urlPath) {
+    let pathname;
+    try {
+      pathname = decodeURIComponent(urlPath.split("?")[0]);
+    } catch {
+      return null;
+    }
+
+    const relPath = (pathname === "/" ? "/index.html" : pathname).replace(/^\/+/, "");
+    const hashed = HASHED_NAME.exec(relPath);
+    const sourcePath = hashed ? `${hashed[1]}${hashed[3]}` : relPath;
+    const fullPath = path.resolve(rootDir, sourcePath);
+
+    if (fullPath !== rootDir && !fullPath.startsWith(`${rootDir}${path.sep}`)) {
+      return null;
+    }
+    return { fullPath, relPath: sourcePath, requestedHash: hashed ? hashed[2] : null };
+  }
+
+  async function readEntry(fullPath, stats) {
+    const ext = path.extname(fullPath).toLowerCase();
+    const entry = {
+      fullPath,
+      size: stats.size,
+      mtimeMs: stats.mtimeMs,
+      type: STATIC_TYPES[ext] || "application/octet-stream",
+      checkedAt: now(),
+      body: null,
+      gzip: null,
+      br: null,
+      hash: null,
+      etag: `"${stats.size.toString(16)}-${Math.floor(stats.mtimeMs).toString(16)}"`,
+    };
+
+    if (stats.size > maxBufferedFileBytes) {
+      return entry;
+    }
+
+    entry.body = await fs.readFile(fullPath);
+    const digest = crypto.createHash("sha1").update(entry.body).digest("hex");
+    entry.hash = digest.slice(0, 8);
+    entry.etag = `"${digest}"`;
+
+    if (COMPRESSIBLE_TYPES.has(ext) && entry.body.length > 0) {
+      const gzip = zlib.gzipSync(entry.body, { level: 9 });
+      const br = zlib.brotliCompressSync(entry.body, {
+        params: { [zlib.constants.BROTLI_PARAM_SIZE_HINT]: entry.body.length },
+      });
+      entry.gzip = gzip.length < entry.body.length ? gzip : null;
+      entry.br = br.length < entry.body.length ? br : null;
+    }
+
+    return entry;
+  }
+
+  async function loadEntry(fullPath) {
+    const cached = entries.get(fullPath);
+    if (cached && now() - cached.checkedAt < revalidateMs) {
+      entries.delete(fullPath);
+      entries.set(fullPath, cached);
+      return cached;
+    }
+
+    const stats = await fs.stat(fullPath);
+    if (!stats.isFile()) {
+      return null;
+    }
+
+    if (cached && cached.mtimeMs === stats.mtimeMs && cached.size === stats.size) {
+      cached.checkedAt = now();
+      entries.delete(fullPath);
+      entries.set(fullPath, cached);
+      return cached;
+    }
+
+    const entry = await readEntry(fullPath, stats);
+    store(entry);
+    if (entry.hash) {
+      contentHashes.set(path.relative(rootDir, fullPath).split(path.sep).join("/"), entry.hash);
+    }
+    return entry;
+  }
+
+  function etagsOf(entry) {
+    const tags = [entry.etag];
+    if (entry.body) {
+      const digest = entry.etag.slice(1, -1);
+      tags.push(`"${digest}-gzip"`, `"${digest}-br"`);
+    }
+    return tags;
+  }
+
+  async function serve(req, res) {
+    const target = resolveTarget(req.url || "/");
+    if (!target) {
+      sendText(res, 403, "Forbidden");
+      return;
+    }
+
+    let entry;
+    try {
+      entry = await loadEntry(target.fullPath);
+    } catch {
+      entry = null;
+    }
+    if (!entry || (target.requestedHash && target.requestedHash !== entry.hash)) {
+      sendText(res, 404, "Not Found");
+      return;
+    }
+
+    const encoding = selectEncoding(entry, req.headers?.["accept-encoding"]);
+    const etag = encoding ? `"${entry.etag.slice(1, -1)}-${encoding}"` : entry.etag;
+    const headers = {
+      "Content-Type": entry.type,
+      ETag: etag,
+      "Cache-Control": target.requestedHash ? IMMUTABLE_CACHE_CONTROL : "no-cache",
+      "Accept-Ranges": "bytes",
+    };
+    if (entry.gzip || entry.br) {
+      headers.Vary = "Accept-Encoding";
+    }
+
+    const ifNoneMatch = req.headers?.["if-none-match"];
+    if (ifNoneMatch) {
+      const candidates = ifNoneMatch.split(",").map((tag) => tag.trim().replace(/^W\//, ""));
+      const known = etagsOf(entry);
+      if (candidates.includes("*") || candidates.some((tag) => known.includes(tag))) {
+        res.writeHead(304, { ETag: etag, "Cache-Control": headers["Cache-Control"] });
+        res.end();
+        return;
+      }
+    }
+
+    const isHead = req.method === "HEAD";
+
+    if (encoding) {
+      const body = entry[encoding];
+      res.writeHead(200, { ...headers, "Content-Encoding": encoding, "Content-Length": body.length });
+      res.end(isHead ? undefined : body);
+      return;
+    }
+
+    const range = req.headers?.range ? parseRange(req.headers.range, entry.size) : null;
+    if (range?.unsatisfiable) {
+      sendText(res, 416, "Range Not Satisfiable", { "Content-Range": `bytes */${entry.size}` });
+      return;
+    }
+
+    const start = range ? range.start : 0;
+    const end = range ? range.end : entry.size - 1;
+    const length = entry.size === 0 ? 0 : end - start + 1;
+    res.writeHead(range ? 206 : 200, {
+      ...headers,
+      "Content-Length": length,
+      ...(range ? { "Content-Range": `bytes ${start}-${end}/${entry.size}` } : {}),
+    });
+
+    if (isHead || length === 0) {
+      res.end();
+      return;
+    }
+
+    if (entry.body) {
+      res.end(range ? entry.body.subarray(start, end + 1) : entry.body);
+      return;
+    }
+
+    // 버퍼링하지 않는 큰 파일은 필요한 구간만 스트리밍
+    const stream = createReadStream(entry.fullPath, { start, end });
+    stream.on("error", () => res.destroy());
+    stream.pipe(res);
+  }
+
+  // 시작 시 전체 파일을 읽어 캐시/압축본/내용 해시를 미리 준비
+  async function warm(dir = rootDir) {
+    let dirents;
+    try {
+      dirents = await fs.readdir(dir, { withFileTypes: true });
+    } catch {
+      return;
+    }
+
+    await Promise.all(
+      dirents.map(async (dirent) => {
+        const fullPath = path.join(dir, dirent.name);
+        if (dirent.isDirectory()) {
+          await warm(fullPath);
+        } else if (dirent.isFile() && !dirent.name.startsWith(".")) {
+          await loadEntry(fullPath).catch(() => null);
+        }
+      }),
+    );
+  }
+
+  // "assets/clothes/hot.png" -> "assets/clothes/hot.1a2b3c4d.png" (해시를 아직 모르면 원래 경로)
+  function versionedPath(assetPath) {
+    if (typeof assetPath !== "string") return assetPath;
+    const relPath = assetPath.replace(/^\/+/, "");
+    const hash = contentHashes.get(relPath);
+    if (!hash) return assetPath;
+
+    const ext = path.extname(relPath);
+    const prefix = assetPath.startsWith("/") ? "/" : "";
+    return `${prefix}${relPath.slice(0, -ext.length)}.${hash}${ext}`;
+  }
+
+  function stats() {
+    return { entries: entries.size, bytes: totalBytes };
+  }
+
+  return { serve, warm, versionedPath, stats };
+}
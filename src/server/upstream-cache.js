@@ -0,0 +1,185 @@
+// 외부 날씨/대기질 API 응답 캐시
+// - 좌표(소수점 반올림)로 키를 만들어 같은 도시 요청을 공유
+// - 현재 값은 정시마다 바뀌므로 TTL과 다음 정시 중 이른 시각에 만료하고, 정시를 넘어도 stale 값으로 응답하며 갱신
+// - 소스별 TTL, 만료 후 staleMs 동안은 이전 값을 주면서 백그라운드로 갱신(stale-while-revalidate)
+// - 메모리 상한을 넘으면 가장 오래 사용되지 않은 항목부터 제거(LRU)
+// - 같은 키로 진행 중인 요청은 하나의 외부 호출로 합침(coalescing)
+// - 합쳐진 호출은 기다리는 요청이 모두 취소됐을 때만 취소하고, 백그라운드 갱신은 끝까지 진행
+
+const MINUTE = 60_000;
+const HOUR = 60 * MINUTE;
+
+export const DEFAULT_CACHE_TTLS = {
+  weather: 10 * MINUTE,
+  airQuality: 30 * MINUTE,
+  airQualityHourly: 30 * MINUTE,
+  waqi: 30 * MINUTE,
+};
+
+export function buildCacheKey(source, { latitude, longitude }, precision = 2) {
+  const lat = Number(latitude).toFixed(precision);
+  const lon = Number(longitude).toFixed(precision);
+  return `${source}:${lat},${lon}`;
+}
+
+function estimateSize(value) {
+  try {
+    // JS 문자열은 UTF-16이므로 대략 글자 수 * 2 바이트로 계산
+    return JSON.stringify(value).length * 2;
+  } catch {
+    return 0;
+  }
+}
+
+export function createUpstreamCache({
+  ttls = {},
+  staleMs = 5 * MINUTE,
+  maxBytes = 2_000_000,
+  maxEntries = 5_000,
+  precision = 2,
+  now = Date.now,
+} = {}) {
+  const sourceTtls = { ...DEFAULT_CACHE_TTLS, ...ttls };
+  const entries = new Map();
+  const inflight = new Map();
+  const counters = {
+    hits: 0,
+    staleHits: 0,
+    misses: 0,
+    coalesced: 0,
+    revalidations: 0,
+    evictions: 0,
+    errors: 0,
+  };
+  let totalBytes = 0;
+
+  function remove(key) {
+    const entry = entries.get(key);
+    if (!entry) return;
+    entries.delete(key);
+    totalBytes -= entry.size;
+  }
+
+  function store(key, source, value) {
+    remove(key);
+    const ttl = sourceTtls[source] ?? DEFAULT_CACHE_TTLS.weather;
+    const storedAt = now();
+    const size = estimateSize(value);
+    if (size > maxBytes) return;
+
+    const expiresAt = Math.min(storedAt + ttl, (Math.floor(storedAt / HOUR) + 1) * HOUR);
+    entries.set(key, {
+      value,
+      size,
+      expiresAt,
+      staleUntil: expiresAt + staleMs,
+    });
+    totalBytes += size;
+
+    // Map은 삽입 순서를 유지하므로 첫 항목이 가장 오래 사용되지 않은 항목
+    while (totalBytes > maxBytes || entries.size > maxEntries) {
+      const oldestKey = entries.keys().next().value;
+      remove(oldestKey);
+      counters.evictions += 1;
+    }
+  }
+
+  // 진행 중인 호출은 자체 AbortSignal로 실행하고, 기다리는 요청이 모두 취소됐을 때만 취소
+  // signal 없이 기다리는 쪽(백그라운드 갱신 등)이 하나라도 있으면 끝까지 진행
+  function load(key, source, loader) {
+    const controller = new AbortController();
+    const pending = { controller, waiters: 0, pinned: false, promise: null };
+
+    pending.promise = Promise.resolve()
+      .then(() => {
+        controller.signal.throwIfAborted();
+        return loader(controller.signal);
+      })
+      .then(
+        (value) => {
+          // null은 "데이터 없음"이므로 저장하지 않고 다음 요청에서 다시 시도
+          if (value != null) store(key, source, value);
+          return value;
+        },
+        (error) => {
+          if (!controller.signal.aborted) counters.errors += 1;
+          throw error;
+        },
+      )
+      .finally(() => {
+        inflight.delete(key);
+      });
+
+    inflight.set(key, pending);
+    return pending;
+  }
+
+  function join(pending, signal) {
+    if (!signal) {
+      pending.pinned = true;
+      return pending.promise;
+    }
+
+    const leave = () => {
+      pending.waiters -= 1;
+      if (pending.waiters === 0 && !pending.pinned) pending.controller.abort();
+    };
+    pending.waiters += 1;
+    if (signal.aborted) {
+      leave();
+    } else {
+      signal.addEventListener("abort", leave, { once: true });
+    }
+    return pending.promise;
+  }
+
+  // loader는 이 캐시가 관리하는 AbortSignal을 받음 (요청 쪽 signal은 options.signal로 전달)
+  async function get(source, coordinates, loader, { signal } = {}) {
+    const key = buildCacheKey(source, coordinates, precision);
+    const entry = entries.get(key);
+
+    if (entry) {
+      // 최근 사용 순서 갱신
+      entries.delete(key);
+      entries.set(key, entry);
+
+      const current = now();
+      if (current < entry.expiresAt) {
+        counters.hits += 1;
+        return entry.value;
+      }
+
+      if (current < entry.staleUntil) {
+        counters.staleHits += 1;
+        if (!inflight.has(key)) {
+          counters.revalidations += 1;
+          // 백그라운드 갱신은 요청이 끝나도 취소하지 않음
+          // 실패는 이미 errors에 집계되며, 기존 값으로 계속 응답
+          join(load(key, source, loader), null).catch(() => {});
+        }
+        return entry.value;
+      }
+
+      remove(key);
+    }
+
+    if (inflight.has(key)) {
+      counters.coalesced += 1;
+      return join(inflight.get(key), signal);
+    }
+
+    counters.misses += 1;
+    return join(load(key, source, loader), signal);
+  }
+
+  function stats() {
+    return { ...counters, entries: entries.size, bytes: totalBytes, inflight: inflight.size };
+  }
+
+  function clear() {
+    entries.clear();
+    totalBytes = 0;
+  }
+
+  return { get, stats, clear };
+}
@@ -0,0 +1,34 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { createBatchLoader } from "../src/server/batch-loader.js";
+
+test("같은 시간 창의 요청은 한 번의 배치로 묶임", async () => {
+  const batches = [];
+  const loader = createBatchLoader(async (keys) => {
+    batches.push(keys);
+    return keys.map((key) => key * 10);
+  });
+
+  const results = await Promise.all([loader.load(1), loader.load(2), loader.load(3)]);
+
+  assert.deepEqual(results, [10, 20, 30]);
+  assert.deepEqual(batches, [[1, 2, 3]]);
+});
+
+test("배치 크기 상한을 넘으면 나누어 호출하고 Error 항목만 실패 처리", async () => {
+  const batches = [];
+  const loader = createBatchLoader(
+    async (keys) => {
+      batches.push(keys);
+      return keys.map((key) => (key === 2 ? new Error("bad") : key));
+    },
+    { maxBatchSize: 2 },
+  );
+
+  const results = await Promise.allSettled([loader.load(1), loader.load(2), loader.load(3)]);
+
+  assert.deepEqual(batches, [[1, 2], [3]]);
+  assert.equal(results[0].value, 1);
+  assert.equal(results[1].status, "rejected");
+  assert.equal(results[2].value, 3);
+});
@@ -0,0 +1,95 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { createGeocoder, createPrefixIndex } from "../src/server/geocoder.js";
+
+test("접두어 색인은 정확히 일치하는 이름과 인구 많은 곳을 먼저 반환", () => {
+  const index = createPrefixIndex();
+  index.add({ name: "Seongnam", latitude: 37.44, longitude: 127.14, population: 948_757 });
+  index.add({ name: "Seoul", latitude: 37.57, longitude: 126.98, population: 10_349_312 }, ["서울"]);
+  index.add({ name: "Se", latitude: 1, longitude: 1, population: 10 });
+
+  assert.deepEqual(
+    index.search("se", 5).map((place) => place.name),
+    ["Se", "Seoul", "Seongnam"],
+  );
+  assert.equal(index.search("서", 5)[0].name, "Seoul");
+  assert.deepEqual(index.search("SEOUL ", 5).map((place) => place.name), ["Seoul"]);
+  assert.deepEqual(index.search("x", 5), []);
+});
+
+test("색인 결과가 충분하면 외부 호출 없이 응답하고, 외부 결과는 재사용", async () => {
+  const calls = [];
+  const geocoder = createGeocoder({
+    gazetteer: [{ name: "Seoul", names: ["서울"], latitude: 37.57, longitude: 126.98, population: 10_000_000 }],
+    fetchImpl: async (url) => {
+      calls.push(url.searchParams.get("name"));
+      const name = url.searchParams.get("name");
+      return {
+        ok: true,
+        async json() {
+          return name === "Nowhere" ? {} : { results: [{ name: "Gangneung", latitude: 37.75, longitude: 128.9 }] };
+        },
+      };
+    },
+  });
+
+  assert.equal((await geocoder.search("seo", { count: 1 })).source, "index");
+
+  const [first, second] = await Promise.all([geocoder.search("Gangneung"), geocoder.search("gangneung")]);
+  assert.equal(first.source, "upstream");
+  assert.equal(second.results[0].name, "Gangneung");
+
+  const learned = await geocoder.search("Gang", { count: 1 });
+  assert.equal(learned.source, "index");
+
+  await geocoder.search("Nowhere");
+  const empty = await geocoder.search("nowhere");
+  assert.equal(empty.source, "cache");
+  assert.deepEqual(empty.results, []);
+
+  assert.deepEqual(calls, ["Gangneung", "Nowhere"]);
+});
+
+test("색인 결과가 count보다 적으면 외부 결과와 중복 없이 합침", async () => {
+  const calls = [];
+  const geocoder = createGeocoder({
+    gazetteer: [{ name: "London", latitude: 51.51, longitude: -0.13, country: "United Kingdom", population: 8_961_989 }],
+    fetchImpl: async (url) => {
+      calls.push(url.searchParams.get("name"));
+      return {
+        ok: true,
+        async json() {
+          return {
+            results: [
+              { name: "London", latitude: 51.50853, longitude: -0.12574, country: "United Kingdom" },
+              { name: "London", latitude: 42.98339, longitude: -81.23304, country: "Canada" },
+            ],
+          };
+        },
+      };
+    },
+  });
+
+  const first = await geocoder.search("London", { count: 5 });
+  assert.equal(first.source, "upstream");
+  assert.deepEqual(first.results.map((place) => place.country), ["United Kingdom", "Canada"]);
+
+  const second = await geocoder.search("london", { count: 5 });
+  assert.equal(second.source, "cache");
+  assert.deepEqual(second.results.map((place) => place.country), ["United Kingdom", "Canada"]);
+  assert.deepEqual(calls, ["London"]);
+});
+
+test("외부 호출이 실패해도 색인 결과가 있으면 그대로 응답", async () => {
+  const geocoder = createGeocoder({
+    gazetteer: [{ name: "Santiago", latitude: -33.45, longitude: -70.67, population: 6_000_000 }],
+    callUpstream: async () => {
+      throw new Error("외부 API(geocoding-api.open-meteo.com) 연결이 일시적으로 중단되었습니다.");
+    },
+  });
+
+  const { results, source, degraded } = await geocoder.search("San");
+  assert.equal(source, "index");
+  assert.equal(degraded, true);
+  assert.deepEqual(results.map((place) => place.name), ["Santiago"]);
+});
@@ -0,0 +1,52 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { createLatencyHistogram, createMetrics } from "../src/server/metrics.js";
+
+test("HDR 히스토그램 분위수는 1/8 상대 오차 안에서 계산", () => {
+  const histogram = createLatencyHistogram();
+  for (let ms = 1; ms <= 1_000; ms += 1) histogram.record(ms);
+
+  assert.equal(histogram.count, 1_000);
+  for (const [q, expected] of [
+    [0.5, 500],
+    [0.99, 990],
+  ]) {
+    const value = histogram.quantile(q);
+    assert.ok(value >= expected && value <= expected * 1.125, `q=${q} value=${value}`);
+  }
+  assert.equal(histogram.countAtOrBelow(0.5), 0);
+  assert.equal(histogram.countAtOrBelow(10_000), 1_000);
+});
+
+test("Prometheus 텍스트 형식으로 카운터와 히스토그램 출력", () => {
+  const metrics = createMetrics();
+  metrics.increment("weather_fallback_total", "폴백 경로 사용 횟수", { path: "weather_error" });
+  metrics.increment("weather_fallback_total", "폴백 경로 사용 횟수", { path: "weather_error" });
+  metrics.observe("weather_upstream_duration_seconds", "외부 API 응답 시간", { host: "api.waqi.info" }, 30);
+
+  const text = metrics.render();
+  assert.match(text, /# TYPE weather_fallback_total counter/);
+  assert.match(text, /weather_fallback_total\{path="weather_error"\} 2/);
+  assert.match(text, /weather_upstream_duration_seconds_bucket\{host="api.waqi.info",le="0.025"\} 0/);
+  assert.match(text, /weather_upstream_duration_seconds_bucket\{host="api.waqi.info",le="0.05"\} 1/);
+  assert.match(text, /weather_upstream_duration_seconds_sum\{host="api.waqi.info"\} 0.03/);
+});
+
+test("샘플링을 끄면 시간을 재지 않고 Server-Timing도 만들지 않음", async () => {
+  let clockReads = 0;
+  const metrics = createMetrics({
+    sampleRate: 0,
+    now: () => {
+      clockReads += 1;
+      return 0;
+    },
+  });
+
+  const timing = metrics.startRequest("recommendations");
+  await timing.time("weather", Promise.resolve(1));
+  timing.measure("recommend", () => 2);
+  timing.finish();
+
+  assert.equal(timing.header(), null);
+  assert.equal(clockReads, 0);
+});
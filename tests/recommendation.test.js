@@ -1,6 +1,12 @@
 import test from "node:test";
 import assert from "node:assert/strict";
-import { recommendOutfit, selectTemperatureBand } from "../src/recommendation.js";
+import {
+  OUTFIT_BANDS,
+  collapseTimeline,
+  recommendHourly,
+  recommendOutfit,
+  selectTemperatureBand,
+} from "../src/recommendation.js";
 
 test("기온 30도는 고온 밴드를 선택", () => {
   const band = selectTemperatureBand(30);
@@ -34,3 +40,76 @@ test("저온에서는 보온 소품을 추천", () => {
   assert.ok(result.accessories.some(a => a.name === "장갑"));
   assert.equal(result.outfitLabel, "패딩/두꺼운 코트");
 });
+
+test("밴드 조회 테이블은 선형 탐색과 같은 결과", () => {
+  for (let temp = -60; temp <= 60; temp += 0.25) {
+    const expected = OUTFIT_BANDS.find((band) => temp >= band.min) || OUTFIT_BANDS[OUTFIT_BANDS.length - 1];
+    assert.equal(selectTemperatureBand(temp).key, expected.key, `tempC=${temp}`);
+  }
+});
+
+test("시간별 열 데이터는 같은 옷차림 구간으로 묶임", () => {
+  const time = ["09", "10", "11", "12", "13", "14", "15"].map((hour) => `2026-02-13T${hour}:00`);
+  const hourly = recommendHourly({
+    tempC: Float64Array.from([14, 15, 16, 16, 24, 25, 25]),
+    humidity: Float64Array.from([50, 50, 50, 50, 50, 50, 50]),
+    uvIndex: Float64Array.from([1, 1, 1, 1, 1, 1, 1]),
+    precipitationMm: Float64Array.from([0, 0, 0, 0, 0, 0, 0]),
+    precipitationProbability: Float64Array.from([0, 0, 0, 0, 0, 70, 70]),
+  });
+  const { segments, summary } = collapseTimeline(time, hourly);
+
+  assert.deepEqual(
+    segments.map((segment) => [segment.bandKey, segment.accessories]),
+    [
+      ["chilly", []],
+      ["warm", []],
+      ["warm", ["우산"]],
+    ],
+  );
+  assert.equal(summary, "09–13 자켓/후드, 13–14 반팔 + 얇은 셔츠, 14–16 반팔 + 얇은 셔츠 + 우산");
+});
+
+test("자정을 넘는 구간은 날짜별로 나누고 다음 날에는 날짜 표시", () => {
+  const time = Array.from({ length: 39 }, (_, i) => {
+    const hour = 9 + i;
+    return `2026-02-${13 + Math.floor(hour / 24)}T${String(hour % 24).padStart(2, "0")}:00`;
+  });
+  const constant = (value) => new Float64Array(time.length).fill(value);
+  const hourly = recommendHourly({
+    tempC: constant(15),
+    humidity: constant(50),
+    uvIndex: constant(0),
+    precipitationMm: constant(0),
+    precipitationProbability: constant(0),
+  });
+  const { segments, summary } = collapseTimeline(time, hourly);
+
+  assert.deepEqual(
+    segments.map((segment) => [segment.from, segment.to]),
+    [
+      ["2026-02-13T09:00", "2026-02-13T23:00"],
+      ["2026-02-14T00:00", "2026-02-14T23:00"],
+    ],
+  );
+  assert.equal(summary, "09–24 자켓/후드, 내일 00–24 자켓/후드");
+});
+
+test("시간별 소품 마스크는 recommendOutfit 규칙과 일치", () => {
+  const snapshot = {
+    tempC: 4,
+    humidity: 40,
+    uvIndex: 7,
+    precipitationMm: 0.5,
+    precipitationProbability: 10,
+    pm25: 40,
+  };
+  const { masks } = recommendHourly(
+    Object.fromEntries(Object.entries(snapshot).map(([key, value]) => [key, [value]])),
+    { temperatureRange: 12 },
+  );
+  const { segments } = collapseTimeline(["2026-02-13T09:00"], { bands: Uint8Array.of(7), masks });
+  const expected = recommendOutfit({ ...snapshot, temperatureRange: 12 }).accessories.map((a) => a.name);
+
+  assert.deepEqual([...segments[0].accessories].sort(), [...expected].sort());
+});
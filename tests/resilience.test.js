@@ -0,0 +1,128 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { createCircuitBreaker, firstAvailable, upstreamError, withDeadline } from "../src/server/resilience.js";
+
+const delay = (ms, value) => new Promise((resolve) => setTimeout(() => resolve(value), ms));
+
+test("느린 소스는 지연 후 다음 소스와 경쟁하고 먼저 온 값을 사용", async () => {
+  const started = [];
+  const result = await firstAvailable(
+    [
+      () => {
+        started.push("primary");
+        return delay(200, "primary");
+      },
+      () => {
+        started.push("hedge");
+        return delay(10, "hedge");
+      },
+    ],
+    { hedgeDelayMs: 20 },
+  );
+
+  assert.equal(result, "hedge");
+  assert.deepEqual(started, ["primary", "hedge"]);
+});
+
+test("앞 소스가 비어 있으면 지연 없이 다음 소스로 넘어가고 모두 실패하면 null", async () => {
+  const startedAt = Date.now();
+  const value = await firstAvailable(
+    [async () => null, async () => { throw new Error("down"); }, async () => "waqi"],
+    { hedgeDelayMs: 1_000 },
+  );
+  assert.equal(value, "waqi");
+  assert.ok(Date.now() - startedAt < 500);
+
+  assert.equal(await firstAvailable([async () => null, async () => null]), null);
+});
+
+test("시간 예산을 넘기면 대체 값으로 응답", async () => {
+  assert.equal(await withDeadline(delay(200, "late"), 10, () => "fallback"), "fallback");
+  assert.equal(await withDeadline(delay(1, "fast"), 100, () => "fallback"), "fast");
+});
+
+test("연속 실패한 호스트는 차단 후 쿨다운이 지나면 한 번 시험 호출", async () => {
+  let current = 0;
+  const breaker = createCircuitBreaker({ failureThreshold: 2, cooldownMs: 1_000, now: () => current });
+  let calls = 0;
+  const failing = async () => {
+    calls += 1;
+    return null;
+  };
+
+  const options = { emptyIsFailure: true };
+  await breaker.call("api.waqi.info", failing, options);
+  await breaker.call("api.waqi.info", failing, options);
+  await assert.rejects(breaker.call("api.waqi.info", failing, options));
+  assert.equal(calls, 2);
+  assert.equal(breaker.stats()["api.waqi.info"].state, "open");
+
+  current += 1_000;
+  assert.equal(await breaker.call("api.waqi.info", async () => ({ aqi: 10 })).then((v) => v.aqi), 10);
+  assert.equal(breaker.stats()["api.waqi.info"].state, "closed");
+});
+
+test("빈 응답과 호출 측 취소는 실패로 집계하지 않고 오류만 집계", async () => {
+  const breaker = createCircuitBreaker({ failureThreshold: 2 });
+  const host = "air-quality-api.open-meteo.com";
+
+  for (let i = 0; i < 5; i += 1) {
+    assert.equal(await breaker.call(host, async () => null), null);
+  }
+  const controller = new AbortController();
+  controller.abort();
+  for (let i = 0; i < 2; i += 1) {
+    await assert.rejects(breaker.call(host, async () => controller.signal.throwIfAborted()));
+  }
+  assert.equal(breaker.stats()[host].state, "closed");
+
+  await assert.rejects(breaker.call(host, async () => { throw new Error("HTTP 500"); }));
+  await assert.rejects(breaker.call(host, async () => { throw new Error("HTTP 500"); }));
+  assert.equal(breaker.stats()[host].state, "open");
+});
+
+test("요청 쪽 문제인 4xx 응답은 회로 실패로 집계하지 않고 429와 5xx만 집계", async () => {
+  const breaker = createCircuitBreaker({ failureThreshold: 2 });
+  const host = "api.open-meteo.com";
+  const failWith = (status) => async () => {
+    throw upstreamError("날씨 API 요청에 실패했습니다.", { status });
+  };
+
+  for (const status of [400, 400, 404, 400, 400]) {
+    await assert.rejects(breaker.call(host, failWith(status)), (error) => error.status === status);
+  }
+  assert.equal(breaker.stats()[host].state, "closed");
+  assert.equal(breaker.stats()[host].failures, 0);
+
+  await assert.rejects(breaker.call(host, failWith(429)));
+  await assert.rejects(breaker.call(host, failWith(503)));
+  assert.equal(breaker.stats()[host].state, "open");
+});
+
+test("hedge 상한을 넘으면 미리 시작하지 않고, 응답이 정해지면 진 작업은 취소", async () => {
+  let active = 0;
+  const acquireHedge = () => {
+    if (active >= 1) return null;
+    active += 1;
+    return () => {
+      active -= 1;
+    };
+  };
+  const aborted = [];
+  const started = [];
+  const slowPrimary = (id) => () => delay(60, `primary-${id}`);
+  const hedge = (id) => (signal) => {
+    started.push(id);
+    signal.addEventListener("abort", () => aborted.push(id));
+    return delay(200, `hedge-${id}`);
+  };
+
+  const results = await Promise.all(
+    [1, 2, 3].map((id) => firstAvailable([slowPrimary(id), hedge(id)], { hedgeDelayMs: 10, acquireHedge })),
+  );
+
+  assert.deepEqual(results, ["primary-1", "primary-2", "primary-3"]);
+  assert.deepEqual(started, [1]);
+  assert.deepEqual(aborted, [1]);
+  assert.equal(active, 0);
+});
@@ -4,7 +4,10 @@ import { mkdtemp, readFile } from "node:fs/promises";
 import os from "node:os";
 import path from "node:path";
 import http from "node:http";
-import { createWeatherServer } from "../src/server/app-server.js";
+import { buildRecommendationSnapshot, createWeatherServer } from "../src/server/app-server.js";
+import { loadGazetteer } from "../src/server/geocoder.js";
+import { openSnapshot } from "../src/server/snapshot.js";
+import { createUpstreamCache } from "../src/server/upstream-cache.js";
 
 function jsonResponse(payload, status = 200) {
   return {
@@ -16,9 +19,10 @@ function jsonResponse(payload, status = 200) {
   };
 }
 
-function buildMockFetch() {
+function buildMockFetch(calls = []) {
   return async function mockFetch(url) {
     const target = typeof url === "string" ? new URL(url) : url;
+    calls.push(target);
 
     if (target.hostname === "geocoding-api.open-meteo.com") {
       const name = target.searchParams.get("name") || "Unknown";
@@ -28,8 +32,10 @@ function buildMockFetch() {
     }
 
     if (target.hostname === "api.open-meteo.com") {
-      return jsonResponse({
+      const count = (target.searchParams.get("latitude") || "").split(",").length;
+      const forecast = {
         current: {
+          time: "2026-02-13T09:00",
           temperature_2m: 26,
           relative_humidity_2m: 65,
           uv_index: 7,
@@ -40,14 +46,22 @@ function buildMockFetch() {
           temperature_2m_max: [28, 24],
           temperature_2m_min: [18, 14],
         },
-      });
+        hourly: {
+          time: Array.from({ length: 48 }, (_, hour) =>
+            `2026-02-${13 + Math.floor(hour / 24)}T${String(hour % 24).padStart(2, "0")}:00`,
+          ),
+          temperature_2m: Array.from({ length: 48 }, (_, hour) => (hour % 24 < 12 ? 15 : 26)),
+          precipitation_probability: Array.from({ length: 48 }, () => 0),
+        },
+      };
+      return jsonResponse(count > 1 ? Array.from({ length: count }, () => forecast) : forecast);
     }
 
     return jsonResponse({ message: "Not found" }, 404);
   };
 }
 
-function requestJson(port, method, pathname, body) {
+function requestJson(port, method, pathname, body, extraHeaders = {}) {
   return new Promise((resolve, reject) => {
     const payload = body ? JSON.stringify(body) : "";
     const req = http.request(
@@ -60,8 +74,9 @@ function requestJson(port, method, pathname, body) {
           ? {
             "Content-Type": "application/json",
             "Content-Length": Buffer.byteLength(payload),
+            ...extraHeaders,
           }
-          : undefined,
+          : extraHeaders,
       },
       (res) => {
         let raw = "";
@@ -69,8 +84,9 @@ function requestJson(port, method, pathname, body) {
           raw += chunk;
         });
         res.on("end", () => {
-          const parsed = raw ? JSON.parse(raw) : {};
-          resolve({ status: res.statusCode, body: parsed });
+          const isJson = (res.headers["content-type"] || "").includes("application/json");
+          const parsed = raw && isJson ? JSON.parse(raw) : raw || {};
+          resolve({ status: res.statusCode, headers: res.headers, body: parsed });
         });
       },
     );
@@ -81,8 +97,8 @@ function requestJson(port, method, pathname, body) {
   });
 }
 
-async function withServer(run) {
-  const server = createWeatherServer({ fetchImpl: buildMockFetch() });
+async function withServer(run, { calls = [], fetchImpl = buildMockFetch(calls), ...options } = {}) {
+  const server = createWeatherServer({ fetchImpl, snapshot: null, snapshotStore: null, ...options });
 
   await new Promise((resolve) => server.listen(0, resolve));
   const port = server.address().port;
@@ -109,5 +125,397 @@ test("POST /api/recommendations returns cards with recommendation", async () =>
     assert.ok(Array.isArray(response.body.cards[0].recommendation.items));
     assert.equal(response.body.cards[0].name, "Seoul");
     assert.equal(response.body.cards[1].name, "Busan");
+    assert.equal(response.body.cards[0].weather.hourly, undefined);
+    assert.match(response.body.cards[0].timeline.summary, /^09–12 자켓\/후드 \+ 머플러, 12–24 반팔 \+ 얇은 셔츠/);
+  });
+});
+
+test("같은 도시를 여러 번 요청해도 외부 날씨 API는 한 번만 호출", async () => {
+  const calls = [];
+  await withServer(
+    async ({ port }) => {
+      const tokyo = { name: "Tokyo", latitude: 35.6895, longitude: 139.69171 };
+      const locations = [
+        { id: "tokyo-1", ...tokyo },
+        { id: "tokyo-2", ...tokyo },
+      ];
+
+      const first = await requestJson(port, "POST", "/api/recommendations", { locations });
+      const second = await requestJson(port, "POST", "/api/recommendations", { locations });
+
+      assert.equal(first.status, 200);
+      assert.equal(second.body.cards.length, 2);
+      assert.equal(second.body.cards[1].weather.tempC, 26);
+
+      const weatherCalls = calls.filter((target) => target.hostname === "api.open-meteo.com");
+      assert.equal(weatherCalls.length, 1);
+
+      const health = await requestJson(port, "GET", "/api/health");
+      assert.equal(health.body.cache.misses > 0, true);
+      assert.equal(health.body.cache.hits + health.body.cache.coalesced >= 3, true);
+    },
+    { calls },
+  );
+});
+
+test("여러 위치의 예보와 대기질은 각각 한 번의 배치 호출로 조회", async () => {
+  const calls = [];
+  await withServer(
+    async ({ port }) => {
+      const locations = [
+        { id: "test-1", name: "Seoul", latitude: 37.5, longitude: 127.0 },
+        { id: "test-2", name: "Busan", latitude: 35.1, longitude: 129.0 },
+        { id: "test-3", name: "Jeju", latitude: 33.5, longitude: 126.5 },
+      ];
+
+      const response = await requestJson(port, "POST", "/api/recommendations", { locations });
+
+      assert.equal(response.status, 200);
+      assert.ok(response.body.cards.every((card) => card.weather.tempC === 26));
+
+      const forecastCalls = calls.filter((target) => target.hostname === "api.open-meteo.com");
+      const currentAirCalls = calls.filter(
+        (target) => target.hostname === "air-quality-api.open-meteo.com" && target.searchParams.has("current"),
+      );
+      assert.equal(forecastCalls.length, 1);
+      assert.equal(forecastCalls[0].searchParams.get("latitude"), "37.5,35.1,33.5");
+      assert.equal(currentAirCalls.length, 1);
+    },
+    { calls },
+  );
+});
+
+test("좌표가 잘못된 위치가 섞여도 나머지 위치는 배치 호출로 정상 응답", async () => {
+  const calls = [];
+  const mockFetch = buildMockFetch(calls);
+  // Open-Meteo처럼 범위를 벗어난 좌표가 하나라도 있으면 배치 전체를 400으로 거절
+  const strictFetch = async (url, options) => {
+    const target = new URL(url);
+    const latitudes = (target.searchParams.get("latitude") || "").split(",").filter(Boolean);
+    if (latitudes.some((value) => Math.abs(Number(value)) > 90)) {
+      calls.push(target);
+      return jsonResponse({ error: true, reason: "Latitude must be in range of -90 to 90°." }, 400);
+    }
+    return mockFetch(url, options);
+  };
+
+  await withServer(
+    async ({ port }) => {
+      const locations = [
+        { id: "good", name: "Seoul", latitude: 37.5, longitude: 127.0 },
+        { id: "bad", name: "Nowhere", latitude: 999, longitude: 127.0 },
+        { id: "empty", name: "Empty", latitude: "", longitude: null },
+      ];
+
+      const response = await requestJson(port, "POST", "/api/recommendations", { locations });
+
+      assert.equal(response.status, 200);
+      assert.notEqual(response.body.cards[0].weather.source, "fallback");
+      assert.equal(response.body.cards[0].weather.tempC, 26);
+      assert.equal(response.body.cards[1].weather.source, "fallback");
+      assert.equal(response.body.cards[2].weather.source, "fallback");
+
+      const forecastCalls = calls.filter((target) => target.hostname === "api.open-meteo.com");
+      assert.equal(forecastCalls.length, 1);
+      assert.equal(forecastCalls[0].searchParams.get("latitude"), "37.5");
+    },
+    { fetchImpl: strictFetch },
+  );
+});
+
+test("응답하지 않는 외부 API가 있어도 시간 예산 안에 폴백 카드로 응답", async () => {
+  const hangingFetch = (url, options = {}) =>
+    new Promise((_, reject) => {
+      options.signal?.addEventListener("abort", () => reject(new Error("aborted")));
+    });
+
+  await withServer(
+    async ({ port }) => {
+      const locations = [{ id: "test-1", name: "Seoul", latitude: 37.5, longitude: 127.0 }];
+      const startedAt = Date.now();
+
+      const response = await requestJson(port, "POST", "/api/recommendations", { locations });
+
+      assert.equal(response.status, 200);
+      assert.equal(response.body.cards[0].weather.source, "fallback");
+      assert.ok(Date.now() - startedAt < 1_000);
+    },
+    { fetchImpl: hangingFetch, requestBudgetMs: 100, upstreamTimeoutMs: 300 },
+  );
+});
+
+test("stream=ndjson 요청은 카드를 한 줄씩 전송하고 done으로 끝남", async () => {
+  await withServer(async ({ port }) => {
+    const payload = JSON.stringify({
+      locations: [
+        { id: "test-1", name: "Seoul", latitude: 37.5, longitude: 127.0 },
+        { id: "test-2", name: "Busan", latitude: 35.1, longitude: 129.0 },
+      ],
+    });
+
+    const { status, contentType, raw } = await new Promise((resolve, reject) => {
+      const req = http.request(
+        {
+          host: "127.0.0.1",
+          port,
+          method: "POST",
+          path: "/api/recommendations?stream=ndjson",
+          headers: { "Content-Type": "application/json", "Content-Length": Buffer.byteLength(payload) },
+        },
+        (res) => {
+          let body = "";
+          res.on("data", (chunk) => {
+            body += chunk;
+          });
+          res.on("end", () =>
+            resolve({ status: res.statusCode, contentType: res.headers["content-type"], raw: body }),
+          );
+        },
+      );
+      req.on("error", reject);
+      req.end(payload);
+    });
+
+    const events = raw.trim().split("\n").map((line) => JSON.parse(line));
+    const cards = events.filter((event) => event.type === "card");
+
+    assert.equal(status, 200);
+    assert.match(contentType, /application\/x-ndjson/);
+    assert.equal(cards.length, 2);
+    assert.deepEqual(cards.map((event) => event.index).sort(), [0, 1]);
+    assert.equal(cards.find((event) => event.index === 1).card.name, "Busan");
+    assert.deepEqual(events.at(-1), { type: "done", count: 2 });
   });
 });
+
+test("추천 응답에 Server-Timing 헤더를 붙이고 /api/metrics로 Prometheus 지표 제공", async () => {
+  await withServer(async ({ port }) => {
+    const locations = [{ id: "test-1", name: "Seoul", latitude: 37.5, longitude: 127.0 }];
+
+    const response = await requestJson(port, "POST", "/api/recommendations", { locations });
+    assert.match(response.headers["server-timing"], /weather;dur=[\d.]+/);
+    assert.match(response.headers["server-timing"], /recommend;dur=[\d.]+/);
+    assert.match(response.headers["server-timing"], /total;dur=[\d.]+$/);
+
+    const metrics = await requestJson(port, "GET", "/api/metrics");
+    assert.equal(metrics.status, 200);
+    assert.match(metrics.headers["content-type"], /text\/plain; version=0.0.4/);
+    assert.match(metrics.body, /weather_upstream_requests_total\{host="api.open-meteo.com",outcome="ok"\} 1/);
+    assert.match(metrics.body, /weather_upstream_duration_seconds_count\{host="api.open-meteo.com"\} 1/);
+    assert.match(metrics.body, /weather_fallback_total\{path="air_quality_none"\} 1/);
+    assert.match(metrics.body, /weather_cache_events_total\{event="misses"\} \d+/);
+  });
+});
+
+test("GET /api/geocode는 번들 도시 목록에서 외부 호출 없이 응답", async () => {
+  const calls = [];
+  await withServer(
+    async ({ port }) => {
+      const cached = await requestJson(port, "GET", "/api/geocode?name=Tok&count=1");
+      assert.equal(cached.status, 200);
+      assert.equal(cached.body.source, "index");
+      assert.equal(cached.body.results[0].name, "Tokyo");
+
+      const remote = await requestJson(port, "GET", "/api/geocode?name=Atlantis");
+      assert.equal(remote.body.source, "upstream");
+      assert.equal(remote.body.results[0].name, "Atlantis");
+
+      const geocodingCalls = calls.filter((target) => target.hostname === "geocoding-api.open-meteo.com");
+      assert.equal(geocodingCalls.length, 1);
+    },
+    { calls },
+  );
+});
+
+test("지오코딩 API 장애로 색인 결과만 준 응답은 캐시하지 않음", async () => {
+  const mockFetch = buildMockFetch();
+  const fetchImpl = async (url) =>
+    url.hostname === "geocoding-api.open-meteo.com" ? jsonResponse({ reason: "unavailable" }, 503) : mockFetch(url);
+
+  await withServer(
+    async ({ port }) => {
+      const full = await requestJson(port, "GET", "/api/geocode?name=Tok&count=1");
+      assert.equal(full.headers["cache-control"], "public, max-age=3600");
+
+      const degraded = await requestJson(port, "GET", "/api/geocode?name=Tok&count=5");
+      assert.equal(degraded.status, 200);
+      assert.equal(degraded.body.source, "index");
+      assert.equal(degraded.body.results[0].name, "Tokyo");
+      assert.equal(degraded.headers["cache-control"], "no-store");
+    },
+    { fetchImpl },
+  );
+});
+
+test("스냅샷에 있는 위치는 콜드 스타트에도 외부 호출 없이 추천", async () => {
+  const locations = [{ id: "seoul", name: "Seoul", latitude: 37.5665, longitude: 126.978 }];
+  const forecastFetch = buildMockFetch();
+  const fetchImpl = async (url) =>
+    url.hostname === "air-quality-api.open-meteo.com"
+      ? jsonResponse({ current: { pm2_5: 12, pm10: 20, us_aqi: 40 } })
+      : forecastFetch(url);
+  const { buffer, count } = await buildRecommendationSnapshot({ fetchImpl, locations });
+  assert.equal(count, 1);
+
+  const calls = [];
+  await withServer(
+    async ({ port }) => {
+      const response = await requestJson(port, "POST", "/api/recommendations", { locations });
+      assert.equal(response.status, 200);
+      const [card] = response.body.cards;
+      assert.equal(card.weather.tempC, 26);
+      assert.equal(card.weather.source, undefined);
+      assert.equal(card.weather.pm25, 12);
+      assert.ok(card.recommendation.outfitLabel);
+      assert.match(card.timeline.summary, /^09–12 /);
+      assert.equal(calls.length, 0);
+
+      const health = await requestJson(port, "GET", "/api/health");
+      assert.equal(health.body.snapshot.count, 1);
+      assert.equal(health.body.snapshot.fresh, true);
+    },
+    { calls, snapshot: openSnapshot(buffer) },
+  );
+});
+
+test("예약 실행으로 만든 스냅샷을 공유 저장소에 기록하고, 새 인스턴스는 시작 시 읽어 외부 호출 없이 응답", async () => {
+  const previousSecret = process.env.CRON_SECRET;
+  const previousTopN = process.env.SNAPSHOT_TOP_N;
+  process.env.CRON_SECRET = "test-secret";
+  process.env.SNAPSHOT_TOP_N = "3";
+
+  // 인스턴스 간에 공유되는 KV 저장소 대역
+  let stored = null;
+  const snapshotStore = {
+    async load() {
+      return stored;
+    },
+    async save(buffer, { ttlMs }) {
+      assert.ok(ttlMs > 0);
+      stored = Buffer.from(buffer);
+    },
+  };
+
+  try {
+    await withServer(
+      async ({ port }) => {
+        const denied = await requestJson(port, "GET", "/api/cron/refresh-snapshot");
+        assert.equal(denied.status, 401);
+
+        const refreshed = await requestJson(port, "GET", "/api/cron/refresh-snapshot", null, {
+          Authorization: "Bearer test-secret",
+        });
+        assert.equal(refreshed.status, 200);
+        assert.equal(refreshed.body.count, 3);
+        assert.equal(refreshed.body.stored, true);
+        assert.equal(stored.subarray(0, 4).toString(), "WOSN");
+      },
+      { snapshotStore },
+    );
+
+    // 배포 파일도 /tmp도 없는 새 인스턴스
+    const calls = [];
+    await withServer(
+      async ({ port }) => {
+        const [city] = loadGazetteer().sort((a, b) => b.population - a.population);
+        const response = await requestJson(port, "POST", "/api/recommendations", {
+          locations: [{ id: "top", name: city.name, latitude: city.latitude, longitude: city.longitude }],
+        });
+        assert.equal(response.status, 200);
+        assert.equal(response.body.cards[0].weather.tempC, 26);
+        assert.equal(calls.filter((target) => target.hostname === "api.open-meteo.com").length, 0);
+
+        const health = await requestJson(port, "GET", "/api/health");
+        assert.equal(health.body.snapshot.count, 3);
+      },
+      { calls, snapshotStore },
+    );
+  } finally {
+    for (const [key, value] of [["CRON_SECRET", previousSecret], ["SNAPSHOT_TOP_N", previousTopN]]) {
+      if (value === undefined) delete process.env[key];
+      else process.env[key] = value;
+    }
+  }
+});
+
+test("대기질 데이터가 없는 위치가 많아도 대기질 호스트 회로를 차단하지 않음", async () => {
+  const forecastFetch = buildMockFetch();
+  const fetchImpl = async (url) => {
+    if (url.hostname !== "air-quality-api.open-meteo.com") {
+      return forecastFetch(url);
+    }
+    if (url.searchParams.has("hourly")) {
+      return jsonResponse({ hourly: { time: [] } });
+    }
+    const latitudes = url.searchParams.get("latitude").split(",");
+    const results = latitudes.map((latitude) =>
+      latitude === "37.5665" ? { current: { pm2_5: 21, pm10: 30, us_aqi: 60 } } : {},
+    );
+    return jsonResponse(results.length > 1 ? results : results[0]);
+  };
+
+  await withServer(
+    async ({ port }) => {
+      const uncovered = Array.from({ length: 6 }, (_, i) => ({ id: `sea-${i}`, latitude: -40 - i, longitude: -120 }));
+      await requestJson(port, "POST", "/api/recommendations", { locations: uncovered });
+
+      const response = await requestJson(port, "POST", "/api/recommendations", {
+        locations: [{ id: "seoul", name: "Seoul", latitude: 37.5665, longitude: 126.978 }],
+      });
+      assert.equal(response.body.cards[0].weather.pm25, 21);
+
+      const health = await requestJson(port, "GET", "/api/health");
+      assert.equal(health.body.breakers["air-quality-api.open-meteo.com"].state, "closed");
+    },
+    { fetchImpl },
+  );
+});
+
+test("hedge로 받은 stale 대기질 값의 백그라운드 갱신은 응답 뒤에도 취소되지 않고 완료", async () => {
+  let current = Date.UTC(2026, 1, 13, 9, 10);
+  const cache = createUpstreamCache({ now: () => current });
+  const forecastFetch = buildMockFetch();
+  let hourlyCalls = 0;
+  const fetchImpl = async (url, options = {}) => {
+    if (url.hostname !== "air-quality-api.open-meteo.com") {
+      return forecastFetch(url);
+    }
+    if (url.searchParams.has("current")) {
+      return jsonResponse({});
+    }
+    hourlyCalls += 1;
+    const pm25 = hourlyCalls === 1 ? 10 : 40;
+    // 갱신 호출은 응답이 끝난 뒤에 도착하도록 지연
+    await new Promise((resolve, reject) => {
+      const timer = setTimeout(resolve, hourlyCalls === 1 ? 0 : 30);
+      options.signal?.addEventListener("abort", () => {
+        clearTimeout(timer);
+        reject(options.signal.reason);
+      });
+    });
+    return jsonResponse({ hourly: { time: ["2026-02-13T09:00"], pm2_5: [pm25], pm10: [20], us_aqi: [50] } });
+  };
+
+  await withServer(
+    async ({ port }) => {
+      const locations = [{ id: "seoul", name: "Seoul", latitude: 37.5665, longitude: 126.978 }];
+      const first = await requestJson(port, "POST", "/api/recommendations", { locations });
+      assert.equal(first.body.cards[0].weather.pm25, 10);
+
+      // TTL(30분)은 지났지만 stale 구간 안
+      current += 31 * 60_000;
+      const stale = await requestJson(port, "POST", "/api/recommendations", { locations });
+      assert.equal(stale.body.cards[0].weather.pm25, 10);
+
+      await new Promise((resolve) => setTimeout(resolve, 80));
+      const stats = cache.stats();
+      assert.equal(stats.revalidations, 1);
+      assert.equal(stats.errors, 0);
+
+      const refreshed = await requestJson(port, "POST", "/api/recommendations", { locations });
+      assert.equal(refreshed.body.cards[0].weather.pm25, 40);
+      assert.equal(hourlyCalls, 2);
+    },
+    { fetchImpl, cache },
+  );
+});
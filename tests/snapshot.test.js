@@ -0,0 +1,116 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { buildSnapshot, encodeSnapshot, openSnapshot, selectSnapshotLocations } from "../src/server/snapshot.js";
+import { createSnapshotStoreFromEnv } from "../src/server/snapshot-store.js";
+
+function sampleWeather(tempC) {
+  return {
+    tempC,
+    humidity: 60,
+    uvIndex: 4,
+    precipitationMm: 0,
+    precipitationProbability: 20,
+    temperatureRange: 8.5,
+    updatedAt: "2026-02-13T09:00",
+    timezone: "Asia/Seoul",
+    hourly: {
+      time: ["2026-02-13T00:00", "2026-02-13T01:00", "2026-02-13T02:00"],
+      tempC: Float64Array.from([10, 11, Number.NaN]),
+      humidity: Float64Array.from([50, 50, 50]),
+      uvIndex: Float64Array.from([0, 0, 0]),
+      precipitationMm: Float64Array.from([0, 0, 0]),
+      precipitationProbability: Float64Array.from([0, 10, 20]),
+    },
+    tomorrow: { tempMax: 14, tempMin: 4, precipitationProbability: 30, uvIndex: 3, precipitationMm: null },
+  };
+}
+
+test("스냅샷은 고정 길이 레코드와 좌표 색인으로 위치를 찾아 복원", () => {
+  const buffer = encodeSnapshot(
+    [
+      { latitude: 37.5665, longitude: 126.978, weather: sampleWeather(12.5), airQuality: { pm25: 18, pm10: 30, airQualityIndex: 55 } },
+      { latitude: 35.1796, longitude: 129.0756, weather: sampleWeather(15), airQuality: null },
+    ],
+    { createdAt: 1_000, maxAgeMs: 60_000, hourlyLength: 3 },
+  );
+  const snapshot = openSnapshot(buffer);
+
+  assert.equal(snapshot.count, 2);
+  assert.equal(buffer.length, 32 + 2 * 8 + 2 * (128 + 3 * 5 * 4));
+
+  const seoul = snapshot.lookup({ latitude: 37.57, longitude: 126.98 });
+  assert.equal(seoul.weather.tempC, 12.5);
+  assert.equal(seoul.weather.timezone, "Asia/Seoul");
+  assert.deepEqual(seoul.airQuality, { pm25: 18, pm10: 30, airQualityIndex: 55 });
+  assert.deepEqual(seoul.weather.hourly.time, ["2026-02-13T00:00", "2026-02-13T01:00", "2026-02-13T02:00"]);
+  assert.ok(Number.isNaN(seoul.weather.hourly.tempC[2]));
+  assert.equal(seoul.weather.tomorrow.tempAvg, 9);
+  assert.equal(seoul.weather.tomorrow.precipitationMm, null);
+
+  assert.equal(snapshot.lookup({ latitude: 35.18, longitude: 129.08 }).airQuality, null);
+  assert.equal(snapshot.lookup({ latitude: 33.5, longitude: 126.5 }), null);
+
+  assert.equal(snapshot.isFresh(30_000), true);
+  assert.equal(snapshot.isFresh(61_000), false);
+});
+
+test("형식이나 버전이 다른 스냅샷은 거부", () => {
+  assert.throws(() => openSnapshot(Buffer.from("not a snapshot")), /형식/);
+
+  const buffer = encodeSnapshot([], { createdAt: 0 });
+  buffer.writeUInt16LE(99, 4);
+  assert.throws(() => openSnapshot(buffer), /버전/);
+});
+
+test("상위 N개 도시와 격자로 대상 위치를 고르고 실패한 위치는 제외", async () => {
+  const locations = selectSnapshotLocations({
+    gazetteer: [
+      { name: "Small", latitude: 1, longitude: 1, population: 10 },
+      { name: "Big", latitude: 2, longitude: 2, population: 1_000 },
+    ],
+    top: 1,
+    grid: { latMin: 37, latMax: 37.5, lonMin: 127, lonMax: 127, step: 0.5 },
+  });
+  assert.deepEqual(locations, [
+    { name: "Big", latitude: 2, longitude: 2 },
+    { latitude: 37, longitude: 127 },
+    { latitude: 37.5, longitude: 127 },
+  ]);
+
+  const { count, buffer } = await buildSnapshot({
+    locations,
+    fetchWeatherBatch: async (batch) => batch.map((location) => (location.latitude === 2 ? new Error("x") : sampleWeather(5))),
+    fetchAirQualityBatch: async () => {
+      throw new Error("대기질 API 요청에 실패했습니다.");
+    },
+    hourlyLength: 3,
+  });
+  assert.equal(count, 2);
+  assert.equal(openSnapshot(buffer).lookup({ latitude: 37, longitude: 127 }).weather.tempC, 5);
+});
+
+test("공유 저장소는 스냅샷을 base64로 저장하고 만료 시간을 함께 지정", async () => {
+  const requests = [];
+  const values = new Map();
+  const fetchImpl = async (url, options) => {
+    const args = JSON.parse(options.body);
+    requests.push({ url, authorization: options.headers.Authorization, args });
+    const result = args[0] === "SET" ? (values.set(args[1], args[2]), "OK") : (values.get(args[1]) ?? null);
+    return { ok: true, async json() { return { result }; } };
+  };
+
+  assert.equal(createSnapshotStoreFromEnv({}), null);
+  const store = createSnapshotStoreFromEnv(
+    { KV_REST_API_URL: "https://kv.example.com", KV_REST_API_TOKEN: "token" },
+    { fetchImpl },
+  );
+
+  assert.equal(await store.load(), null);
+  const buffer = encodeSnapshot([], { createdAt: 1_000 });
+  await store.save(buffer, { ttlMs: 60_000 });
+  assert.equal(openSnapshot(await store.load()).createdAt, 1_000);
+
+  assert.equal(requests[0].url, "https://kv.example.com");
+  assert.equal(requests[0].authorization, "Bearer token");
+  assert.deepEqual(requests[1].args.slice(-2), ["PX", "60000"]);
+});
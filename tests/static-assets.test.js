@@ -0,0 +1,105 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { mkdtemp, mkdir, writeFile, utimes } from "node:fs/promises";
+import os from "node:os";
+import path from "node:path";
+import http from "node:http";
+import zlib from "node:zlib";
+import { createStaticAssets, parseRange } from "../src/server/static-assets.js";
+
+function request(port, pathname, headers = {}) {
+  return new Promise((resolve, reject) => {
+    const req = http.request({ host: "127.0.0.1", port, path: pathname, headers }, (res) => {
+      const chunks = [];
+      res.on("data", (chunk) => chunks.push(chunk));
+      res.on("end", () => resolve({ status: res.statusCode, headers: res.headers, body: Buffer.concat(chunks) }));
+    });
+    req.on("error", reject);
+    req.end();
+  });
+}
+
+async function withStaticServer(options, run) {
+  const root = await mkdtemp(path.join(os.tmpdir(), "static-assets-"));
+  await mkdir(path.join(root, "assets"), { recursive: true });
+  await writeFile(path.join(root, "index.html"), `<html>${"<p>옷차림</p>".repeat(200)}</html>`);
+  await writeFile(path.join(root, "assets", "hot.png"), Buffer.alloc(4_096, 7));
+
+  const assets = createStaticAssets({ root, revalidateMs: 0, ...options });
+  await assets.warm();
+  const server = http.createServer((req, res) => assets.serve(req, res));
+  await new Promise((resolve) => server.listen(0, resolve));
+
+  try {
+    await run({ port: server.address().port, assets, root });
+  } finally {
+    await new Promise((resolve) => server.close(resolve));
+  }
+}
+
+test("Range 헤더 해석", () => {
+  assert.deepEqual(parseRange("bytes=0-9", 100), { start: 0, end: 9 });
+  assert.deepEqual(parseRange("bytes=90-", 100), { start: 90, end: 99 });
+  assert.deepEqual(parseRange("bytes=-10", 100), { start: 90, end: 99 });
+  assert.deepEqual(parseRange("bytes=200-300", 100), { unsatisfiable: true });
+  assert.equal(parseRange("bytes=0-1,5-6", 100), null);
+});
+
+test("PNG MIME 타입과 ETag 304, 텍스트 자산 압축본 제공", async () => {
+  await withStaticServer({}, async ({ port }) => {
+    const png = await request(port, "/assets/hot.png");
+    assert.equal(png.status, 200);
+    assert.equal(png.headers["content-type"], "image/png");
+    assert.ok(png.headers.etag);
+
+    const notModified = await request(port, "/assets/hot.png", { "If-None-Match": png.headers.etag });
+    assert.equal(notModified.status, 304);
+
+    const html = await request(port, "/", { "Accept-Encoding": "gzip, deflate, br" });
+    assert.equal(html.headers["content-encoding"], "br");
+    assert.match(zlib.brotliDecompressSync(html.body).toString(), /옷차림/);
+
+    const gzipped = await request(port, "/index.html", { "Accept-Encoding": "gzip" });
+    assert.equal(gzipped.headers["content-encoding"], "gzip");
+    assert.notEqual(gzipped.headers.etag, html.headers.etag);
+  });
+});
+
+test("큰 파일은 스트리밍하며 Range 요청에 206으로 응답", async () => {
+  await withStaticServer({ maxBufferedFileBytes: 1_024 }, async ({ port }) => {
+    const partial = await request(port, "/assets/hot.png", { Range: "bytes=100-199" });
+    assert.equal(partial.status, 206);
+    assert.equal(partial.headers["content-range"], "bytes 100-199/4096");
+    assert.equal(partial.body.length, 100);
+
+    const invalid = await request(port, "/assets/hot.png", { Range: "bytes=5000-" });
+    assert.equal(invalid.status, 416);
+  });
+});
+
+test("내용 해시 URL은 immutable로 응답하고 파일이 바뀌면 새 해시를 사용", async () => {
+  await withStaticServer({}, async ({ port, assets, root }) => {
+    const versioned = assets.versionedPath("assets/hot.png");
+    assert.match(versioned, /^assets\/hot\.[0-9a-f]{8}\.png$/);
+
+    const response = await request(port, `/${versioned}`);
+    assert.equal(response.status, 200);
+    assert.match(response.headers["cache-control"], /immutable/);
+
+    const filePath = path.join(root, "assets", "hot.png");
+    await writeFile(filePath, Buffer.alloc(4_096, 9));
+    const later = new Date(Date.now() + 5_000);
+    await utimes(filePath, later, later);
+
+    const stale = await request(port, `/${versioned}`);
+    assert.equal(stale.status, 404);
+    assert.notEqual(assets.versionedPath("assets/hot.png"), versioned);
+  });
+});
+
+test("루트 밖 경로는 거부", async () => {
+  await withStaticServer({}, async ({ port }) => {
+    const response = await request(port, "/..%2f..%2fetc%2fpasswd");
+    assert.equal(response.status, 403);
+  });
+});
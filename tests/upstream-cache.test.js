@@ -0,0 +1,145 @@
+import test from "node:test";
+import assert from "node:assert/strict";
+import { buildCacheKey, createUpstreamCache } from "../src/server/upstream-cache.js";
+
+function createClock(start = Date.UTC(2026, 0, 1, 9, 0)) {
+  let current = start;
+  return {
+    now: () => current,
+    advance(ms) {
+      current += ms;
+    },
+  };
+}
+
+test("근접 좌표는 같은 캐시 키를 사용", () => {
+  const a = buildCacheKey("weather", { latitude: 35.6895, longitude: 139.69171 });
+  const b = buildCacheKey("weather", { latitude: 35.6912, longitude: 139.6941 });
+  const other = buildCacheKey("airQuality", { latitude: 35.6895, longitude: 139.69171 });
+
+  assert.equal(a, b);
+  assert.notEqual(a, other);
+});
+
+test("TTL 안에서는 캐시 값을 재사용하고 동시 요청은 하나로 합침", async () => {
+  const clock = createClock();
+  const cache = createUpstreamCache({ now: clock.now });
+  let calls = 0;
+  const loader = async () => {
+    calls += 1;
+    return { tempC: 20 };
+  };
+  const seoul = { latitude: 37.5665, longitude: 126.978 };
+
+  const [first, second] = await Promise.all([
+    cache.get("weather", seoul, loader),
+    cache.get("weather", seoul, loader),
+  ]);
+  const third = await cache.get("weather", seoul, loader);
+
+  assert.equal(calls, 1);
+  assert.deepEqual(first, { tempC: 20 });
+  assert.equal(second, first);
+  assert.equal(third, first);
+  assert.deepEqual(
+    { misses: cache.stats().misses, coalesced: cache.stats().coalesced, hits: cache.stats().hits },
+    { misses: 1, coalesced: 1, hits: 1 },
+  );
+});
+
+test("만료 직후에는 이전 값을 주면서 백그라운드로 갱신", async () => {
+  const clock = createClock();
+  const cache = createUpstreamCache({ now: clock.now, ttls: { weather: 1_000 }, staleMs: 1_000 });
+  let version = 0;
+  const loader = async () => ({ version: ++version });
+  const seoul = { latitude: 37.5665, longitude: 126.978 };
+
+  await cache.get("weather", seoul, loader);
+  clock.advance(1_500);
+
+  const stale = await cache.get("weather", seoul, loader);
+  assert.equal(stale.version, 1);
+
+  await new Promise((resolve) => setImmediate(resolve));
+  const fresh = await cache.get("weather", seoul, loader);
+  assert.equal(fresh.version, 2);
+  assert.equal(cache.stats().staleHits, 1);
+  assert.equal(cache.stats().revalidations, 1);
+});
+
+test("메모리 상한을 넘으면 가장 오래 사용하지 않은 항목을 제거", async () => {
+  const clock = createClock();
+  const cache = createUpstreamCache({ now: clock.now, maxEntries: 2 });
+  const loader = (name) => async () => ({ name });
+
+  await cache.get("weather", { latitude: 1, longitude: 1 }, loader("a"));
+  await cache.get("weather", { latitude: 2, longitude: 2 }, loader("b"));
+  await cache.get("weather", { latitude: 1, longitude: 1 }, loader("a"));
+  await cache.get("weather", { latitude: 3, longitude: 3 }, loader("c"));
+
+  let reloaded = false;
+  await cache.get("weather", { latitude: 2, longitude: 2 }, async () => {
+    reloaded = true;
+    return { name: "b" };
+  });
+
+  assert.equal(reloaded, true);
+  assert.equal(cache.stats().evictions, 2);
+});
+
+test("정시를 넘으면 이전 시간 값을 stale로 주면서 갱신", async () => {
+  const clock = createClock(Date.UTC(2026, 0, 1, 10, 55));
+  const cache = createUpstreamCache({ now: clock.now });
+  let version = 0;
+  const loader = async () => ({ version: ++version });
+  const seoul = { latitude: 37.5665, longitude: 126.978 };
+
+  await cache.get("weather", seoul, loader);
+  clock.advance(4 * 60_000);
+  assert.equal((await cache.get("weather", seoul, loader)).version, 1);
+
+  // 11:00:30 — TTL은 남았지만 정시가 지났으므로 기존 값으로 응답하고 백그라운드 갱신
+  clock.advance(90_000);
+  assert.equal((await cache.get("weather", seoul, loader)).version, 1);
+  await new Promise((resolve) => setImmediate(resolve));
+  assert.equal((await cache.get("weather", seoul, loader)).version, 2);
+
+  assert.deepEqual(
+    { misses: cache.stats().misses, staleHits: cache.stats().staleHits, entries: cache.stats().entries },
+    { misses: 1, staleHits: 1, entries: 1 },
+  );
+});
+
+test("진행 중인 호출은 기다리는 요청이 모두 취소됐을 때만 취소", async () => {
+  const cache = createUpstreamCache({ now: createClock().now });
+  const seoul = { latitude: 37.5665, longitude: 126.978 };
+  const signals = [];
+  const loader = (signal) =>
+    new Promise((resolve, reject) => {
+      signals.push(signal);
+      const timer = setTimeout(() => resolve({ pm25: 12 }), 20);
+      signal.addEventListener("abort", () => {
+        clearTimeout(timer);
+        reject(signal.reason);
+      });
+    });
+
+  const first = new AbortController();
+  const second = new AbortController();
+  const firstWait = cache.get("waqi", seoul, loader, { signal: first.signal });
+  const secondWait = cache.get("waqi", seoul, loader, { signal: second.signal });
+  first.abort();
+  assert.deepEqual(await secondWait, { pm25: 12 });
+  assert.deepEqual(await firstWait, { pm25: 12 });
+
+  const busan = { latitude: 35.1796, longitude: 129.0756 };
+  const third = new AbortController();
+  const abandoned = cache.get("waqi", busan, loader, { signal: third.signal });
+  third.abort();
+  await assert.rejects(abandoned, { name: "AbortError" });
+
+  // 시작 전에 모두 취소되면 외부 호출 자체를 하지 않음
+  assert.equal(signals.length, 1);
+  assert.equal(signals[0].aborted, false);
+  assert.equal(cache.stats().errors, 0);
+});